@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Локальная заглушка Yandex SmartCaptcha `/validate` для нагрузочных прогонов.
+
+    python -m bench.captcha_stub --port 8081 --delay 0.05
+    CAPTCHA_URL=http://127.0.0.1:8081/validate uvicorn src.main:app
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+from urllib.parse import parse_qs
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+app.state.delay = 0.0
+
+
+@app.post("/validate")
+async def validate(request: Request):
+    form = parse_qs((await request.body()).decode())
+    if app.state.delay:
+        await asyncio.sleep(app.state.delay)
+    if form.get("token") == ["fail"]:
+        return {"status": "failed", "message": "Token invalid or expired.", "host": ""}
+    return {"status": "ok", "message": "", "host": "captcha-stub"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SmartCaptcha stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=0.0, help="response delay, s")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    app.state.delay = args.delay
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк конкурентных инкрементов счётчика подписей:
+единственная строка `voting` (старый verify_sms) против шардированных слотов.
+
+Создаёт временную кампанию и удаляет её по завершении.
+
+    python -m bench.counter_contention --workers 64 --increments 50 --shards 32
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import src.main  # noqa: F401  (регистрирует все модели)
+from src.database import DATABASE_URL
+from src.vote.models import Voting, VoteStatus
+from src.vote.reposiotory import VotingRepo
+
+
+async def single_row(session: AsyncSession, voting_id: UUID) -> None:
+    await session.execute(
+        sa.update(Voting)
+        .where(Voting.id == voting_id)
+        .values(
+            real_quantity=Voting.real_quantity + 1,
+            fake_quantity=Voting.fake_quantity + 1,
+        )
+    )
+
+
+async def sharded(session: AsyncSession, voting_id: UUID) -> None:
+    await VotingRepo(db_session=session)._increment(
+        real=1, fake=1, voting_id=voting_id
+    )
+
+
+async def run(
+    maker: async_sessionmaker[AsyncSession],
+    voting_id: UUID,
+    increment: Callable[[AsyncSession, UUID], Awaitable[None]],
+    workers: int,
+    increments: int,
+) -> float:
+    async def worker() -> None:
+        for _ in range(increments):
+            async with maker() as session:
+                await increment(session, voting_id)
+                await session.commit()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return time.perf_counter() - started
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Voting counter contention benchmark")
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--increments", type=int, default=50)
+    parser.add_argument("--shards", type=int, default=VotingRepo.COUNTER_SHARDS)
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    VotingRepo.COUNTER_SHARDS = args.shards
+    engine = create_async_engine(
+        DATABASE_URL, pool_size=args.workers, max_overflow=0
+    )
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    now = datetime.now(timezone.utc)
+    async with maker() as session:
+        voting = Voting(
+            start_date=now,
+            end_date=now,
+            real_quantity=0,
+            fake_quantity=0,
+            show_real=True,
+            status=VoteStatus.collecting,
+        )
+        session.add(voting)
+        await session.commit()
+        voting_id = voting.id
+
+    total = args.workers * args.increments
+    try:
+        for name, increment in (("single-row", single_row), ("sharded", sharded)):
+            elapsed = await run(maker, voting_id, increment, args.workers, args.increments)
+            print(f"{name:>10}: {total} increments in {elapsed:.2f}s -> {total / elapsed:,.0f}/s")
+
+        async with maker() as session:
+            await VotingRepo(db_session=session).fold_counter_shards()
+            real = await session.scalar(
+                sa.select(Voting.real_quantity).where(Voting.id == voting_id)
+            )
+            await session.commit()
+        print(f"folded total: {real} (expected {2 * total})")
+    finally:
+        async with maker() as session:
+            await session.execute(sa.delete(Voting).where(Voting.id == voting_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Запросов в секунду на `/health` и `/vote/vote_info`: прежняя цепочка из трёх
+`BaseHTTPMiddleware` против `RequestGuardMiddleware`. Приложение вызывается
+in-process через `httpx.ASGITransport`, так что меряется стоимость самого
+стека, а не сети:
+
+    python -m bench.middleware_throughput --duration 5 --concurrency 32
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
+
+import src.main
+from src.database import engine
+
+PATHS = ("/health", "/vote/vote_info")
+HEADERS = {"user-agent": "Mozilla/5.0 (bench)"}
+
+
+def legacy_app() -> FastAPI:
+    """Стек middleware в том виде, в каком он был до перехода на pure ASGI."""
+    app = FastAPI()
+    app.router.routes.extend(src.main.app.router.routes)
+    app.exception_handlers.update(src.main.app.exception_handlers)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["*"],
+    )
+
+    @app.middleware("http")
+    async def rate_limit_middleware(request: Request, call_next):
+        if request.method == "CONNECT":
+            raise HTTPException(status_code=405, detail="Method not allowed")
+        if str(request.url.path).startswith("http"):
+            raise HTTPException(status_code=400, detail="Bad request")
+        user_agent = request.headers.get("user-agent", "").lower()
+        if any(agent in user_agent for agent in ["wget", "python", "scanner", "bot"]):
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def security_headers(request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        return response
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        try:
+            client_host = request.client.host if request.client else "unknown"
+            logger.info(f"Request: {request.method} {request.url} from {client_host}")
+            return await call_next(request)
+        except Exception as e:
+            logger.error(f"Request failed: {e}")
+            raise
+
+    return app
+
+
+async def run(app, path: str, duration: float, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", headers=HEADERS
+    ) as client:
+        (await client.get(path)).raise_for_status()
+        done = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal done
+            while time.perf_counter() < deadline:
+                (await client.get(path)).raise_for_status()
+                done += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return done / (time.perf_counter() - started)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Middleware stack throughput")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    # access-лог пишет на каждый запрос; для замера глушим вывод в обоих стеках
+    logger.remove()
+    stacks = {"BaseHTTPMiddleware": legacy_app(), "pure ASGI": src.main.app}
+    try:
+        for path in PATHS:
+            for name, app in stacks.items():
+                rps = await run(app, path, args.duration, args.concurrency)
+                print(f"{path:<16} {name:<20} {rps:>10,.0f} req/s")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
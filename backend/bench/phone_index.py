@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Телефон строкой (`VARCHAR(20)`, как было) против `BIGINT` (`PhoneNumber`):
+размер уникального индекса и таблицы, поиск по номеру.
+
+Строит две таблицы с одинаковыми номерами, каждая со своим уникальным
+индексом, и удаляет их по завершении. Поиск замеряется двумя способами:
+по одному номеру на запрос (как verify_sms) и пачкой — вложенным циклом по
+индексу, без сетевых задержек.
+
+    python -m bench.phone_index --rows 1000000 --lookups 20000
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Callable
+
+import src.main  # noqa: F401  (регистрирует все модели)
+from src.database import engine, phone_to_int
+
+TABLES = {
+    "varchar": ("bench_phone_varchar", "varchar(20)", str),
+    "bigint": ("bench_phone_bigint", "bigint", phone_to_int),
+}
+
+# те же номера, что у seed_data: +79 и кольцо по 10**9
+FILL_SQL = """
+INSERT INTO {table} (phone_number)
+SELECT {value}
+FROM generate_series(0, $1 - 1) AS i
+"""
+PHONE_TEXT = "'+79' || lpad(((i::bigint * 7919317) % 1000000000)::text, 9, '0')"
+
+
+def phone(index: int) -> str:
+    return f"+79{index * 7_919_317 % 10**9:09d}"
+
+
+async def build(raw: Any, table: str, column_type: str, rows: int) -> dict[str, float]:
+    await raw.execute(f"DROP TABLE IF EXISTS {table}")
+    await raw.execute(f"CREATE TABLE {table} (phone_number {column_type} NOT NULL)")
+    value = f"ltrim({PHONE_TEXT}, '+')::bigint" if column_type == "bigint" else PHONE_TEXT
+
+    started = time.perf_counter()
+    await raw.execute(FILL_SQL.format(table=table, value=value), rows)
+    loaded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await raw.execute(f"CREATE UNIQUE INDEX {table}_uq ON {table} (phone_number)")
+    indexed = time.perf_counter() - started
+    await raw.execute(f"VACUUM ANALYZE {table}")
+
+    index_size, table_size = await raw.fetchrow(
+        "SELECT pg_relation_size($1::regclass), pg_relation_size($2::regclass)",
+        f"{table}_uq",
+        table,
+    )
+    return {
+        "load_s": loaded,
+        "index_build_s": indexed,
+        "index_mb": index_size / 2**20,
+        "table_mb": table_size / 2**20,
+    }
+
+
+async def lookups(
+    raw: Any,
+    table: str,
+    column_type: str,
+    to_db: Callable[[str], Any],
+    phones: list[str],
+) -> dict[str, float]:
+    # по одному номеру на запрос: разбор строки входит в замер, как в ORM
+    stmt = await raw.prepare(f"SELECT 1 FROM {table} WHERE phone_number = $1")
+    timings = []
+    for number in phones:
+        started = time.perf_counter()
+        assert await stmt.fetchval(to_db(number)) == 1
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    # пачкой: только работа индекса на сервере
+    keys = [to_db(number) for number in phones]
+    # varchar(20)[] -> varchar[]
+    array_type = column_type.split("(")[0] + "[]"
+    async with raw.transaction():
+        await raw.execute("SET LOCAL enable_hashjoin = off")
+        await raw.execute("SET LOCAL enable_mergejoin = off")
+        started = time.perf_counter()
+        found = await raw.fetchval(
+            f"SELECT count(*) FROM unnest($1::{array_type}) AS k(phone_number) "
+            f"JOIN {table} USING (phone_number)",
+            keys,
+        )
+        batch = time.perf_counter() - started
+    assert found == len(phones)
+
+    return {
+        "p50_us": statistics.median(timings) * 1e6,
+        "p99_us": timings[int(len(timings) * 0.99)] * 1e6,
+        "batch_us_per_key": batch / len(phones) * 1e6,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Phone column: varchar vs bigint")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    phones = [phone(rng.randrange(args.rows)) for _ in range(args.lookups)]
+
+    results: dict[str, dict[str, float]] = {}
+    try:
+        async with engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            if raw is None:
+                raise RuntimeError("Benchmark needs an open asyncpg connection")
+            try:
+                for name, (table, column_type, _) in TABLES.items():
+                    results[name] = await build(raw, table, column_type, args.rows)
+                for name, (table, column_type, to_db) in TABLES.items():
+                    results[name] |= await lookups(raw, table, column_type, to_db, phones)
+            finally:
+                for table, _, _ in TABLES.values():
+                    await raw.execute(f"DROP TABLE IF EXISTS {table}")
+    finally:
+        await engine.dispose()
+
+    print(f"{args.rows:,} rows, {args.lookups:,} lookups")
+    metrics = list(results["varchar"])
+    print(f"{'':18}" + "".join(f"{name:>12}" for name in results))
+    for metric in metrics:
+        print(f"{metric:18}" + "".join(f"{r[metric]:12.2f}" for r in results.values()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Пропускная способность воркера SMS outbox: кладёт N сообщений в `sms_outbox`
+и ждёт, пока воркер их разошлёт. Запускать против bench.smsaero_stub:
+
+    python -m bench.smsaero_stub --delay 0.2 &
+    SMS_AERO_URL=http://127.0.0.1:8082/v2/sms/send SMS_RATE_LIMIT=1000 \
+        SMS_WORKER_CONCURRENCY=64 python -m bench.sms_outbox_throughput -n 2000
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+
+import sqlalchemy as sa
+
+import src.main  # noqa: F401  (регистрирует все модели)
+from src.core.sms_aero import sms_client
+from src.database import async_session_maker
+from src.vote.models import SmsOutbox, SmsOutboxStatus
+from src.vote.sms_outbox import sms_outbox_worker
+
+PREFIX = "+7999"
+# номер хранится как BIGINT, так что «по префиксу» — это диапазон
+BENCH_PHONES = SmsOutbox.phone_number.between(f"{PREFIX}0000000", f"{PREFIX}9999999")
+
+
+async def pending() -> int:
+    async with async_session_maker() as session:
+        return await session.scalar(
+            sa.select(sa.func.count())
+            .select_from(SmsOutbox)
+            .where(
+                BENCH_PHONES,
+                SmsOutbox.status == SmsOutboxStatus.pending,
+            )
+        ) or 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SMS outbox throughput benchmark")
+    parser.add_argument("-n", type=int, default=1000, help="messages to send")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    async with async_session_maker() as session:
+        await session.execute(
+            sa.insert(SmsOutbox),
+            [
+                {"phone_number": f"{PREFIX}{i:07d}", "body": "bench"}
+                for i in range(args.n)
+            ],
+        )
+        await session.commit()
+
+    await sms_client.start()
+    started = time.perf_counter()
+    sms_outbox_worker.start()
+    try:
+        while await pending():
+            await asyncio.sleep(0.2)
+        elapsed = time.perf_counter() - started
+        print(f"{args.n} messages in {elapsed:.2f}s -> {args.n / elapsed:,.0f}/s")
+    finally:
+        await sms_outbox_worker.stop()
+        await sms_client.close()
+        async with async_session_maker() as session:
+            await session.execute(
+                sa.delete(SmsOutbox).where(BENCH_PHONES)
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Локальная заглушка шлюза SMS Aero (`GET /v2/sms/send`) для прогонов outbox'а.
+
+    python -m bench.smsaero_stub --port 8082 --delay 0.2 --fail-rate 0.05
+    SMS_AERO_URL=http://127.0.0.1:8082/v2/sms/send uvicorn src.main:app
+
+Раз в секунду печатает число принятых сообщений.
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+received = 0
+
+
+async def report() -> None:
+    global received
+    while True:
+        await asyncio.sleep(1)
+        if received:
+            print(f"{received} sms/s")
+            received = 0
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    task = asyncio.create_task(report())
+    yield
+    task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+app.state.delay = 0.0
+app.state.fail_rate = 0.0
+
+
+@app.get("/v2/sms/send")
+async def send(number: str, text: str, sign: str = ""):
+    global received
+    if app.state.delay:
+        await asyncio.sleep(app.state.delay)
+    if random.random() < app.state.fail_rate:
+        return JSONResponse({"success": False, "message": "stub failure"}, 503)
+    received += 1
+    return {"success": True, "data": {"number": number, "text": text, "status": 0}}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SMS Aero stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--delay", type=float, default=0.0, help="response delay, s")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    app.state.delay = args.delay
+    app.state.fail_rate = args.fail_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Стресс-проверка `SmsVerificationRepo.verify_code` под параллельными попытками.
+
+Для каждого раунда заводит номер с известным кодом и одновременно шлёт
+`--parallel` попыток (неверные коды вперемешку с верным), каждую в своей
+сессии. Проверяет инварианты:
+
+* `attempts` не превышает `MAX_ATTEMPTS`;
+* код принят не более одного раза, и ровно столько же раз выросли
+  счётчики подписей кампании;
+* после исчерпания лимита верный код уже не принимается.
+
+Создаёт временные пользователя и коды (и кампанию, если в базе её нет) и
+удаляет их по завершении. Принятые коды засчитываются в текущую кампанию,
+как и в проде, — запускать на тестовой базе.
+
+    python -m bench.verify_attempts --rounds 20 --parallel 64
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import sqlalchemy as sa
+
+import src.main  # noqa: F401  (регистрирует все модели)
+from src.database import async_session_maker, blind_index, engine
+from src.vote.models import SmsVerification, User, Voting, VoteStatus
+from src.vote.reposiotory import SmsVerificationRepo, VotingRepo
+
+PHONE = "+79990000000"
+CODE = "424242"
+MAX_ATTEMPTS = SmsVerificationRepo.MAX_ATTEMPTS
+
+
+async def fake_quantity() -> int:
+    """Счётчик текущей кампании вместе с несвёрнутыми слотами."""
+    async with async_session_maker() as session:
+        current = await VotingRepo(db_session=session).get_current_with_counts()
+    if current is None:
+        raise RuntimeError("No voting campaign")
+    return current[2]
+
+
+async def attempt(code: str) -> bool:
+    async with async_session_maker() as session:
+        return await SmsVerificationRepo(db_session=session).verify_code(PHONE, code)
+
+
+async def run_round(user_id: UUID, parallel: int, with_correct: bool):
+    async with async_session_maker() as session:
+        await session.execute(
+            sa.delete(SmsVerification).where(SmsVerification.phone_number == PHONE)
+        )
+        session.add(
+            SmsVerification(
+                phone_number=PHONE,
+                code=CODE,
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
+                user_id=user_id,
+            )
+        )
+        await session.commit()
+
+    codes = [f"{random.randrange(1_000_000):06d}" for _ in range(parallel)]
+    codes = [c if c != CODE else "000000" for c in codes]
+    if with_correct:
+        codes[random.randrange(parallel)] = CODE
+
+    before = await fake_quantity()
+    results = await asyncio.gather(*(attempt(code) for code in codes))
+    signed = await fake_quantity() - before
+
+    async with async_session_maker() as session:
+        attempts = (
+            await session.execute(
+                sa.select(SmsVerification.attempts).where(
+                    SmsVerification.phone_number == PHONE
+                )
+            )
+        ).scalar_one()
+    accepted = sum(results)
+
+    assert attempts <= MAX_ATTEMPTS, f"attempts={attempts} > {MAX_ATTEMPTS}"
+    assert accepted <= 1, f"code accepted {accepted} times"
+    assert signed == accepted, f"accepted={accepted}, counter +{signed}"
+    # верный код может не попасть в первые MAX_ATTEMPTS попыток — тогда
+    # accepted == 0, и это тоже корректно
+    return attempts, accepted
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel verify_code stress test")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--parallel", type=int, default=64)
+    args = parser.parse_args()
+    if args.parallel <= MAX_ATTEMPTS:
+        parser.error(f"--parallel must exceed MAX_ATTEMPTS ({MAX_ATTEMPTS})")
+
+    voting_id: UUID | None = None
+    user_id = uuid4()
+    async with async_session_maker() as session:
+        if await session.scalar(sa.select(VotingRepo.current_id())) is None:
+            voting_id = uuid4()
+            session.add(
+                Voting(
+                    id=voting_id,
+                    start_date=datetime.now(timezone.utc),
+                    end_date=datetime.now(timezone.utc) + timedelta(days=1),
+                    status=VoteStatus.collecting,
+                )
+            )
+        session.add(
+            User(id=user_id, phone_number=PHONE, phone_hash=blind_index(PHONE))
+        )
+        await session.commit()
+
+    try:
+        accepted_total = 0
+        for i in range(args.rounds):
+            attempts, accepted = await run_round(
+                user_id, args.parallel, with_correct=i % 2 == 0
+            )
+            accepted_total += accepted
+            print(f"round {i:>3}: attempts={attempts:>2} accepted={accepted}")
+
+        # лимит исчерпан — верный код больше не принимается
+        attempts, _ = await run_round(user_id, args.parallel, False)
+        assert attempts == MAX_ATTEMPTS, f"attempts={attempts}, cap not reached"
+        assert not await attempt(CODE), "code accepted after attempt cap"
+        print(f"ok: {args.rounds} rounds, {accepted_total} accepted, cap held")
+    finally:
+        async with async_session_maker() as session:
+            await session.execute(sa.delete(User).where(User.id == user_id))
+            if voting_id is not None:
+                await session.execute(sa.delete(Voting).where(Voting.id == voting_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Загрузка бумажных подписей из CSV / XLSX в таблицу `user` (см. src.vote.importer).
+
+    python import_signatures.py signatures.xlsx --rejects rejects.csv
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+import src.main  # noqa: E402,F401  (регистрирует все модели)
+from src.database import engine  # noqa: E402
+from src.vote.importer import import_users  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk import of offline signatures")
+    parser.add_argument("path", type=Path, help=".csv or .xlsx file with a header row")
+    parser.add_argument(
+        "--rejects",
+        type=Path,
+        help="write skipped lines (invalid, duplicate, existing) to this CSV",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    if not args.path.is_file():
+        raise SystemExit(f"File not found: {args.path}")
+
+    started = time.perf_counter()
+    try:
+        result = await import_users(args.path)
+    finally:
+        await engine.dispose()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"rows: {result.total}, inserted: {result.inserted}, "
+        f"rejected: {len(result.rejected)}, duplicates: {len(result.duplicates)} "
+        f"in {elapsed:.1f}s ({result.total / elapsed:,.0f} rows/s)"
+    )
+    if args.rejects:
+        skipped = sorted(result.rejected + result.duplicates)
+        with open(args.rejects, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(("line", "reason"))
+            writer.writerows(skipped)
+        print(f"skipped lines written to {args.rejects}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
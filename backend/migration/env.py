@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from src.database import DATABASE_URL, Base
 import src.auth.models
 import src.vote.models
+import src.core.rate_limit
 
 config = context.config
 if config.config_file_name:
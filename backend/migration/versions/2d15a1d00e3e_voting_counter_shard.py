@@ -0,0 +1,50 @@
+"""voting counter shard
+
+Revision ID: 2d15a1d00e3e
+Revises: 32a85098fb01
+Create Date: 2026-10-17 10:12:41.512307
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "2d15a1d00e3e"
+down_revision: Union[str, Sequence[str], None] = "32a85098fb01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "voting_counter_shard",
+        sa.Column("voting_id", sa.UUID(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("real_delta", sa.Integer(), nullable=False),
+        sa.Column("fake_delta", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время создания записи",
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время последнего обновления",
+        ),
+        sa.ForeignKeyConstraint(["voting_id"], ["voting.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("voting_id", "shard"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("voting_counter_shard")
@@ -0,0 +1,37 @@
+"""rate limit
+
+Revision ID: 4a1d6f0b8e72
+Revises: 7e2a9c4d1b63
+Create Date: 2026-10-17 16:41:07.512903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4a1d6f0b8e72"
+down_revision: Union[str, Sequence[str], None] = "7e2a9c4d1b63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # UNLOGGED: счётчики не пишутся в WAL и теряются при аварийном рестарте —
+    # для лимитов это допустимо
+    op.create_table(
+        "rate_limit",
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column("window", sa.BigInteger(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("key", "window"),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rate_limit")
@@ -0,0 +1,73 @@
+"""user listing indexes
+
+Revision ID: 5b8f3e2c9d41
+Revises: 9c4e7b1a5f20
+Create Date: 2026-10-17 12:26:03.114872
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8f3e2c9d41"
+down_revision: Union[str, Sequence[str], None] = "9c4e7b1a5f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY — чтобы не блокировать запись подписей на большой таблице
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_created_at_id",
+            "user",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_user_valid_created_at_id",
+            "user",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_where=sa.text("valid_vote"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_user_phone_number_pattern",
+            "user",
+            ["phone_number"],
+            unique=False,
+            postgresql_ops={"phone_number": "varchar_pattern_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_user_phone_number_pattern",
+            table_name="user",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_user_valid_created_at_id",
+            table_name="user",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_user_created_at_id",
+            table_name="user",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
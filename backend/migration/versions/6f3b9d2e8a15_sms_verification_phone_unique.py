@@ -0,0 +1,55 @@
+"""sms verification phone unique
+
+Revision ID: 6f3b9d2e8a15
+Revises: 4a1d6f0b8e72
+Create Date: 2026-10-17 18:12:44.207316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6f3b9d2e8a15"
+down_revision: Union[str, Sequence[str], None] = "4a1d6f0b8e72"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # запись блокируется до конца миграции: между чисткой дублей и
+    # построением индекса новые дубли не появятся. Таблица небольшая,
+    # индекс строится быстро, а чтение не блокируется
+    op.execute("LOCK TABLE sms_verification IN SHARE ROW EXCLUSIVE MODE")
+    # дубли от параллельных переотправок: оставляем подтверждённую запись,
+    # иначе самую свежую
+    op.execute(
+        """
+        DELETE FROM sms_verification
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY phone_number
+                    ORDER BY is_verified DESC, created_at DESC, id
+                ) AS rn
+                FROM sms_verification
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+    # INVALID-индекс от прерванной прежней версии миграции (CONCURRENTLY)
+    op.execute("DROP INDEX IF EXISTS uq_sms_verification_phone_number")
+    op.create_index(
+        "uq_sms_verification_phone_number",
+        "sms_verification",
+        ["phone_number"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_sms_verification_phone_number", table_name="sms_verification")
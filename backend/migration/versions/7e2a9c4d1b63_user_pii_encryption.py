@@ -0,0 +1,177 @@
+"""user pii encryption
+
+Revision ID: 7e2a9c4d1b63
+Revises: 5b8f3e2c9d41
+Create Date: 2026-10-17 14:08:55.402913
+
+"""
+
+import hashlib
+import hmac
+import os
+from typing import Callable, Optional, Sequence, Union
+
+from alembic import op
+from cryptography.fernet import Fernet
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "7e2a9c4d1b63"
+down_revision: Union[str, Sequence[str], None] = "5b8f3e2c9d41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5_000
+
+user = sa.table(
+    "user",
+    sa.column("id", sa.UUID()),
+    sa.column("full_name", sa.VARCHAR()),
+    sa.column("email", sa.VARCHAR()),
+    sa.column("phone_number", sa.VARCHAR()),
+    sa.column("phone_hash", postgresql.BYTEA()),
+)
+
+
+# Шифрование и blind index заморожены в том виде, в каком их ввела эта
+# миграция (src.database на тот момент): она не должна меняться вместе
+# с кодом приложения. Ключи и флаг читаются из окружения — тех же
+# переменных, что и у Settings.
+
+# все токены Fernet начинаются с байта версии 0x80 -> "gAAAAA" в base64
+FERNET_PREFIX = "gAAAAA"
+
+
+def _env_flag(name: str) -> bool:
+    # как разбирает bool pydantic
+    value = os.environ.get(name, "").strip().lower()
+    return value in ("1", "true", "t", "yes", "y", "on")
+
+
+def _pii_keys() -> tuple[Fernet, bytes]:
+    """(Fernet по SECRET, ключ blind index: PII_INDEX_KEY или HMAC от SECRET)."""
+    secret = os.environ["SECRET"]
+    index_key = os.environ.get("PII_INDEX_KEY")
+    return Fernet(secret.encode()), (
+        index_key.encode()
+        if index_key
+        else hmac.new(secret.encode(), b"blind-index", hashlib.sha256).digest()
+    )
+
+
+def _blind_index(key: bytes, value: str) -> bytes:
+    return hmac.new(key, value.strip().encode(), hashlib.sha256).digest()
+
+
+def _encrypt(fernet: Optional[Fernet], value: Optional[str]) -> Optional[str]:
+    if value is None or fernet is None:
+        return value
+    return fernet.encrypt(value.encode()).decode()
+
+
+def _decrypt(fernet: Fernet, value: Optional[str]) -> Optional[str]:
+    if value is None or not value.startswith(FERNET_PREFIX):
+        return value
+    return fernet.decrypt(value.encode()).decode()
+
+
+def _rewrite_users(transform: Callable[[sa.RowMapping], dict]) -> None:
+    """Пересохраняет строки user пачками по id, `transform(row) -> dict`."""
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        stmt = sa.select(user).order_by(user.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            stmt = stmt.where(user.c.id > last_id)
+        rows = bind.execute(stmt).mappings().all()
+        if not rows:
+            return
+        bind.execute(
+            user.update()
+            .where(user.c.id == sa.bindparam("_id"))
+            .values(
+                full_name=sa.bindparam("full_name"),
+                email=sa.bindparam("email"),
+                phone_number=sa.bindparam("phone_number"),
+                phone_hash=sa.bindparam("phone_hash"),
+            ),
+            [{"_id": row["id"], **transform(row)} for row in rows],
+        )
+        last_id = rows[-1]["id"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("user", sa.Column("phone_hash", postgresql.BYTEA(), nullable=True))
+    op.alter_column(
+        "user",
+        "full_name",
+        existing_type=sa.VARCHAR(length=255),
+        type_=sa.VARCHAR(length=1024),
+    )
+    op.alter_column(
+        "user",
+        "email",
+        existing_type=postgresql.CITEXT(),
+        type_=sa.VARCHAR(length=1024),
+    )
+    op.alter_column(
+        "user",
+        "phone_number",
+        existing_type=sa.VARCHAR(length=20),
+        type_=sa.VARCHAR(length=255),
+    )
+
+    fernet, index_key = _pii_keys()
+    # при выключенном PII_ENCRYPTION ПДн остаются открытым текстом,
+    # blind index считается всегда
+    encrypt_with = fernet if _env_flag("PII_ENCRYPTION") else None
+    _rewrite_users(
+        lambda row: {
+            "full_name": _encrypt(encrypt_with, row["full_name"]),
+            "email": _encrypt(encrypt_with, row["email"]),
+            "phone_number": _encrypt(encrypt_with, row["phone_number"]),
+            "phone_hash": _blind_index(index_key, row["phone_number"]),
+        }
+    )
+
+    op.alter_column("user", "phone_hash", nullable=False)
+    op.drop_constraint("uq_user_phone", "user", type_="unique")
+    op.create_unique_constraint("uq_user_phone", "user", ["phone_hash"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_user_phone", "user", type_="unique")
+
+    fernet, _ = _pii_keys()
+    _rewrite_users(
+        lambda row: {
+            "full_name": _decrypt(fernet, row["full_name"]),
+            "email": _decrypt(fernet, row["email"]),
+            "phone_number": _decrypt(fernet, row["phone_number"]),
+            "phone_hash": row["phone_hash"],
+        }
+    )
+
+    op.create_unique_constraint("uq_user_phone", "user", ["phone_number"])
+    op.drop_column("user", "phone_hash")
+    op.alter_column(
+        "user",
+        "phone_number",
+        existing_type=sa.VARCHAR(length=255),
+        type_=sa.VARCHAR(length=20),
+    )
+    op.alter_column(
+        "user",
+        "email",
+        existing_type=sa.VARCHAR(length=1024),
+        type_=postgresql.CITEXT(),
+    )
+    op.alter_column(
+        "user",
+        "full_name",
+        existing_type=sa.VARCHAR(length=1024),
+        type_=sa.VARCHAR(length=255),
+    )
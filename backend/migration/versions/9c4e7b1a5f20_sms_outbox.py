@@ -0,0 +1,78 @@
+"""sms outbox
+
+Revision ID: 9c4e7b1a5f20
+Revises: 2d15a1d00e3e
+Create Date: 2026-10-17 11:02:18.734521
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e7b1a5f20"
+down_revision: Union[str, Sequence[str], None] = "2d15a1d00e3e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sms_outbox",
+        sa.Column(
+            "id", sa.UUID(), server_default=sa.text("gen_random_uuid()"), nullable=False
+        ),
+        sa.Column("phone_number", sa.VARCHAR(length=20), nullable=False),
+        sa.Column("body", sa.VARCHAR(length=255), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM("pending", "sent", "failed", name="sms_outbox_status"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.VARCHAR(length=255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время создания записи",
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время последнего обновления",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_sms_outbox_pending",
+        "sms_outbox",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_sms_outbox_pending",
+        table_name="sms_outbox",
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.drop_table("sms_outbox")
+    op.execute("DROP TYPE IF EXISTS sms_outbox_status")
@@ -0,0 +1,89 @@
+"""export job
+
+Revision ID: b3d7e1f4a926
+Revises: 6f3b9d2e8a15
+Create Date: 2026-10-17 23:10:42.518306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d7e1f4a926"
+down_revision: Union[str, Sequence[str], None] = "6f3b9d2e8a15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "export_job",
+        sa.Column(
+            "id", sa.UUID(), server_default=sa.text("gen_random_uuid()"), nullable=False
+        ),
+        sa.Column("format", sa.VARCHAR(length=8), nullable=False),
+        sa.Column("fingerprint", sa.VARCHAR(length=64), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "pending", "running", "done", "failed", name="export_status"
+            ),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("rows", sa.Integer(), nullable=True),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.VARCHAR(length=255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время создания записи",
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+            comment="Время последнего обновления",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_export_job_fingerprint",
+        "export_job",
+        ["fingerprint", "format"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_export_job_queue",
+        "export_job",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_export_job_queue",
+        table_name="export_job",
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+    op.drop_index("ix_export_job_fingerprint", table_name="export_job")
+    op.drop_table("export_job")
+    op.execute("DROP TYPE IF EXISTS export_status")
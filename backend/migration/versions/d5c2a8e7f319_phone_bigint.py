@@ -0,0 +1,101 @@
+"""phone bigint
+
+Revision ID: d5c2a8e7f319
+Revises: b3d7e1f4a926
+Create Date: 2026-10-18 01:24:57.402913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d5c2a8e7f319"
+down_revision: Union[str, Sequence[str], None] = "b3d7e1f4a926"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# цифры номера: '+7 (999) 123-45-67' -> '79991234567'
+DIGITS = r"regexp_replace(phone_number, '\D', '', 'g')"
+E164 = r"'^[1-9][0-9]{0,14}$'"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # до проверки `Phone` на приёме номер в `sms_verification` мог быть любой
+    # строкой; такие коды подтвердить нельзя (verify_sms проверяет формат),
+    # а СМС на них не уйдут
+    op.execute(f"DELETE FROM sms_verification WHERE {DIGITS} !~ {E164}")
+    op.execute(f"DELETE FROM sms_outbox WHERE {DIGITS} !~ {E164}")
+    # разные записи одного номера ('+7999...' и '+7 999...') после
+    # нормализации совпадут: оставляем подтверждённую, иначе самую свежую
+    op.execute(
+        f"""
+        DELETE FROM sms_verification
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY {DIGITS}
+                    ORDER BY is_verified DESC, created_at DESC, id
+                ) AS rn
+                FROM sms_verification
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+
+    # таблица всё равно переписывается целиком под ACCESS EXCLUSIVE,
+    # индекс строим заново после смены типа
+    op.drop_index("uq_sms_verification_phone_number", table_name="sms_verification")
+    op.alter_column(
+        "sms_verification",
+        "phone_number",
+        type_=sa.BigInteger(),
+        existing_type=sa.VARCHAR(length=20),
+        existing_nullable=False,
+        postgresql_using=f"{DIGITS}::bigint",
+    )
+    op.create_index(
+        "uq_sms_verification_phone_number",
+        "sms_verification",
+        ["phone_number"],
+        unique=True,
+    )
+    op.alter_column(
+        "sms_outbox",
+        "phone_number",
+        type_=sa.BigInteger(),
+        existing_type=sa.VARCHAR(length=20),
+        existing_nullable=False,
+        postgresql_using=f"{DIGITS}::bigint",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "sms_outbox",
+        "phone_number",
+        type_=sa.VARCHAR(length=20),
+        existing_type=sa.BigInteger(),
+        existing_nullable=False,
+        postgresql_using="'+' || phone_number::text",
+    )
+    op.drop_index("uq_sms_verification_phone_number", table_name="sms_verification")
+    op.alter_column(
+        "sms_verification",
+        "phone_number",
+        type_=sa.VARCHAR(length=20),
+        existing_type=sa.BigInteger(),
+        existing_nullable=False,
+        postgresql_using="'+' || phone_number::text",
+    )
+    op.create_index(
+        "uq_sms_verification_phone_number",
+        "sms_verification",
+        ["phone_number"],
+        unique=True,
+    )
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетических подписей для нагрузочных и масштабных проверок.
+
+Пишет `User` и `SmsVerification` бинарным COPY пачками по `BATCH_SIZE`.
+При одинаковых `--seed` и параметрах получаются одинаковые данные (id,
+телефоны, ФИО, время), так что замеры на разных машинах сравнимы. Телефоны
+соответствуют шаблону `Phone`; номера уникальны внутри одного `--seed`, а
+разные seed дают разные диапазоны номеров. Пересечение с уже существующими
+номерами обрывает COPY, и транзакция откатывается. Запускать на тестовой
+базе: в конце пересчитывается счётчик подписей кампании.
+
+    python seed_data.py --users 1000000 --seed 42
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import asyncpg
+
+BASE_DIR = Path(__file__).resolve().parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+import src.main  # noqa: E402,F401  (регистрирует все модели)
+from src.config import settings  # noqa: E402
+from src.database import (  # noqa: E402
+    async_session_maker,
+    blind_index,
+    encrypt_many,
+    engine,
+    phone_to_int,
+)
+from src.vote.reposiotory import VotingRepo  # noqa: E402
+
+BATCH_SIZE = 10_000
+
+USER_COLUMNS = (
+    "id", "full_name", "email", "phone_number", "phone_hash",
+    "valid_vote", "created_at", "updated_at",
+)
+SMS_COLUMNS = (
+    "id", "phone_number", "code", "created_at", "expires_at",
+    "attempts", "is_verified", "user_id", "updated_at",
+)
+
+FIRST_NAMES = (
+    ("Александр", "aleksandr"), ("Мария", "maria"), ("Дмитрий", "dmitry"),
+    ("Анна", "anna"), ("Сергей", "sergey"), ("Елена", "elena"),
+    ("Андрей", "andrey"), ("Ольга", "olga"), ("Иван", "ivan"),
+    ("Наталья", "natalia"), ("Михаил", "mikhail"), ("Татьяна", "tatiana"),
+)
+LAST_NAMES = (
+    ("Иванов", "ivanov"), ("Смирнов", "smirnov"), ("Кузнецов", "kuznetsov"),
+    ("Попов", "popov"), ("Васильев", "vasiliev"), ("Петров", "petrov"),
+    ("Соколов", "sokolov"), ("Михайлов", "mikhailov"), ("Новиков", "novikov"),
+    ("Фёдоров", "fedorov"), ("Морозов", "morozov"), ("Волков", "volkov"),
+)
+# мужские фамилии выше; женские — с «а» на конце
+FEMALE = frozenset(("Мария", "Анна", "Елена", "Ольга", "Наталья", "Татьяна"))
+DOMAINS = ("example.com", "example.org", "example.net")
+
+# шаг по кольцу номеров, взаимно простой с 10**9 и 10**8, — номера
+# идут вразброс, но без повторов
+PHONE_STRIDE = 7_919_317
+
+
+def phone_for(index: int, base: int, moldova: bool) -> str:
+    if moldova:
+        return f"+373{(base + index * PHONE_STRIDE) % 10**8:08d}"
+    return f"+79{(base + index * PHONE_STRIDE) % 10**9:09d}"
+
+
+def make_batch(
+    rng: random.Random,
+    start: int,
+    count: int,
+    args: argparse.Namespace,
+    time_at: Callable[[int], datetime],
+    table: str,
+) -> list[tuple[Any, ...]]:
+    """
+    Строки `table` (`user` или `sms_verification`) для пользователей
+    [start, start + count). Случайные значения тянутся из `rng` в одном
+    порядке для обеих таблиц, поэтому второй проход с тем же seed даёт
+    коды ровно для тех же пользователей.
+    """
+    rows = []
+    for index in range(start, start + count):
+        first, first_latin = rng.choice(FIRST_NAMES)
+        last, last_latin = rng.choice(LAST_NAMES)
+        domain = rng.choice(DOMAINS)
+        # ~2% молдавских номеров; у каждой страны свой счётчик — без коллизий
+        phone = phone_for(index, args.phone_base, moldova=rng.random() < 0.02)
+        user_id = UUID(int=rng.getrandbits(128), version=4)
+        valid_vote = rng.random() >= args.invalid
+        sms_id = UUID(int=rng.getrandbits(128), version=4)
+        code = f"{rng.randrange(1_000_000):06d}"
+        verified = rng.random() < args.verified
+        attempts = rng.randint(1, 3) if verified else rng.randint(0, 10)
+
+        created = time_at(index)
+        created_naive = created.replace(tzinfo=None)
+        if table == "user":
+            if first in FEMALE:
+                last += "а"
+            rows.append(
+                (
+                    user_id,
+                    f"{last} {first}",
+                    f"{first_latin}.{last_latin}{index}@{domain}",
+                    phone,
+                    blind_index(phone),
+                    valid_vote,
+                    created_naive,
+                    created_naive,
+                )
+            )
+        else:
+            rows.append(
+                (
+                    sms_id,
+                    # COPY идёт в обход `PhoneNumber`: BIGINT пишем сами
+                    phone_to_int(phone),
+                    code,
+                    created,
+                    created + timedelta(minutes=5),
+                    attempts,
+                    verified,
+                    user_id,
+                    created_naive,
+                )
+            )
+
+    if table == "user" and settings.PII_ENCRYPTION:
+        ids, names, emails, phones, *rest = zip(*rows)
+        rows = list(
+            zip(ids, encrypt_many(names), encrypt_many(emails), encrypt_many(phones), *rest)
+        )
+    return rows
+
+
+async def seed(args: argparse.Namespace) -> None:
+    # диапазон номеров зависит только от seed
+    args.phone_base = random.Random(f"phones-{args.seed}").randrange(10**8)
+
+    end = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    span = timedelta(days=args.days) / max(args.users, 1)
+    start_at = end - timedelta(days=args.days)
+    jitter_rng = random.Random(f"jitter-{args.seed}")
+    jitter = [jitter_rng.random() for _ in range(1024)]
+
+    def time_at(index: int) -> datetime:
+        # время растёт с номером, как у живой таблицы, но с разбросом
+        return start_at + span * (index + jitter[index % len(jitter)])
+
+    async def rows(table: str) -> AsyncIterator[tuple[Any, ...]]:
+        """Потоково, без накопления: второй проход заново генерирует тот же поток."""
+        rng = random.Random(args.seed)
+
+        def generate(start: int) -> asyncio.Future:
+            count = min(BATCH_SIZE, args.users - start)
+            return asyncio.ensure_future(
+                asyncio.to_thread(make_batch, rng, start, count, args, time_at, table)
+            )
+
+        starts = range(0, args.users, BATCH_SIZE)
+        if not starts:
+            return
+        pending = generate(starts[0])
+        for start in starts:
+            batch = await pending
+            # следующая пачка генерируется, пока COPY отправляет текущую
+            if start + BATCH_SIZE < args.users:
+                pending = generate(start + BATCH_SIZE)
+            for row in batch:
+                yield row
+
+    started = time.perf_counter()
+    async with async_session_maker() as session:
+        conn = await session.connection()
+        raw = (await conn.get_raw_connection()).driver_connection
+        if raw is None:
+            raise RuntimeError("Seeding needs an open asyncpg connection")
+
+        for table, columns in (("user", USER_COLUMNS), ("sms_verification", SMS_COLUMNS)):
+            table_started = time.perf_counter()
+            await raw.copy_records_to_table(table, records=rows(table), columns=columns)
+            print(
+                f"{table}: {args.users:,} rows "
+                f"in {time.perf_counter() - table_started:.1f}s"
+            )
+
+        total = await VotingRepo(db_session=session).reconcile_real_quantity()
+        await session.commit()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"done in {elapsed:.1f}s ({args.users / elapsed:,.0f} users/s); "
+        f"signature counter: {total}"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Seed synthetic signatures")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--days", type=int, default=30, help="spread created_at over this many days"
+    )
+    parser.add_argument(
+        "--verified", type=float, default=0.85, help="share of SMS-confirmed signatures"
+    )
+    parser.add_argument(
+        "--invalid", type=float, default=0.03, help="share with valid_vote = false"
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    try:
+        await seed(args)
+    except asyncpg.UniqueViolationError as exc:
+        raise SystemExit(
+            f"{exc}\nGenerated phones collide with existing rows: "
+            "seed an empty database or pick another --seed"
+        )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,33 @@
+from sqlalchemy import update
+
+from src.auth.models import Admin
+from src.auth.schemas import AdminRead, RegisterForm
+from src.config import settings
+from src.core.generic_crud_repo import GenericCRUDRepository
+
+
+class AdminRepo(GenericCRUDRepository[Admin, RegisterForm, AdminRead]):
+    model = Admin
+    create_schema = RegisterForm
+    update_schema = AdminRead
+
+    # профиль админа запрашивается на каждой загрузке админки
+    cache_ttl = settings.REPO_CACHE_TTL
+
+    async def replace_password_hash(self, hashed: str, new_hash: str) -> bool:
+        """
+        Заменяет хеш пароля, если он не менялся с момента проверки, и
+        сбрасывает кэш профиля.
+
+        Returns:
+            True — хеш обновлён; False — пароль успели сменить.
+        """
+        result = await self._execute_dml(
+            update(Admin)
+            .where(Admin.hashed_password == hashed)
+            .values(hashed_password=new_hash)
+        )
+        if result.rowcount:
+            await self._invalidate_cache()
+        await self.db_session.commit()
+        return bool(result.rowcount)
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.repo_cache import repo_cache
 from src.database import get_async_session
 from src.auth.schemas import (
     LoginForm,
@@ -10,12 +11,14 @@ from src.auth.schemas import (
     RegisterForm,
 )
 from src.auth.models import Admin
+from src.auth.repository import AdminRepo
 from src.auth.utils.passwords import hash_password, verify_password
 from src.dependencies import (
     RefreshDep,
     AuthDep,
     DBSessionDep,
     auth,
+    token_cache,
 )
 
 
@@ -43,7 +46,7 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 #     # 2) создаём запись в БД
 #     user = Admin(
 #         email=data.email,
-#         hashed_password=hash_password(data.password),
+#         hashed_password=await hash_password(data.password),
 #     )
 #     db.add(user)
 #     await db.commit()
@@ -102,12 +105,13 @@ async def get_user(
     db_session: DBSessionDep,
     payload: AuthDep,
 ) -> AdminRead:
-    user_id = UUID(payload.sub)
-
-    user: Admin | None = await db_session.scalar(
-        select(Admin).where(Admin.id == user_id)
-    )
+    # кэш второго уровня AdminRepo: повторные запросы не ходят в БД
+    user = await AdminRepo(db_session=db_session).get(UUID(payload.sub))
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-
     return AdminRead.model_validate(user, from_attributes=True)
+
+
+@router.get("/cache_stats", summary="Статистика кэшей")
+async def cache_stats(payload: AuthDep) -> dict[str, dict[str, int]]:
+    return {"token": token_cache.stats(), **repo_cache.stats()}
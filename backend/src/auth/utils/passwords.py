@@ -1,16 +1,57 @@
-from typing import Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException, status
 from pwdlib import PasswordHash
 from argon2.exceptions import (
     InvalidHashError,
     VerifyMismatchError,
 )
 
+from src.auth.repository import AdminRepo
+from src.config import settings
+from src.core.background import spawn
+from src.database import async_session_maker
+
 _pwd = PasswordHash.recommended()
 
+# Argon2 намеренно дорогой по CPU и памяти: считаем его в отдельном пуле
+# (argon2-cffi отпускает GIL), а не в event loop. Семафор ограничивает очередь:
+# кто не дождался слота за PASSWORD_HASH_QUEUE_TIMEOUT, получает 503.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="argon2"
+)
+_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+
+R = TypeVar("R")
+
 
-def hash_password(password: str) -> Any:
+async def _run_in_pool(func: Callable[[], R]) -> R:
+    try:
+        await asyncio.wait_for(
+            _slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, попробуйте позже",
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func)
+    finally:
+        _slots.release()
+
+
+async def hash_password(password: str) -> Any:
     """Хешируем пароль → строка вида  $argon2id$…"""
-    return _pwd.hash(password)
+    return await _run_in_pool(partial(_pwd.hash, password))
+
+
+async def _store_rehash(hashed: str, new_hash: str) -> None:
+    async with async_session_maker() as session:
+        await AdminRepo(db_session=session).replace_password_hash(hashed, new_hash)
 
 
 async def verify_password(plain: str, hashed: str) -> bool:
@@ -19,10 +60,12 @@ async def verify_password(plain: str, hashed: str) -> bool:
     * True  – совпало;
     * False – не совпало / неизвестная схема.
     Если алгоритм или cost устарели, получим новый хеш и
-    сохраняем его в БД асинхронно.
+    сохраняем его в БД фоновой задачей.
     """
     try:
-        verified, new_hash = _pwd.verify_and_update(plain, hashed)
+        verified, new_hash = await _run_in_pool(
+            partial(_pwd.verify_and_update, plain, hashed)
+        )
     except InvalidHashError:
         return False
     except VerifyMismatchError:
@@ -30,20 +73,6 @@ async def verify_password(plain: str, hashed: str) -> bool:
 
     if verified and new_hash:
         # «тихое» обновление cost-параметров
-        from src.database import async_session_maker
-        from src.auth.models import Admin
-        import sqlalchemy as sa
-        import asyncio
-
-        async def _store():
-            async with async_session_maker() as ses:
-                await ses.execute(
-                    sa.update(Admin)
-                    .where(Admin.hashed_password == hashed)
-                    .values(hashed_password=new_hash)
-                )
-                await ses.commit()
-
-        asyncio.create_task(_store())
+        spawn(_store_rehash(hashed, new_hash), name="admin-password-rehash")
 
     return verified
@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from authx import AuthXConfig
 
@@ -21,6 +22,99 @@ class Settings(BaseSettings):
     SMS_API_KEY: str
     SMS_SIGN: str
 
+    CAPTCHA_URL: str = "https://smartcaptcha.yandexcloud.net/validate"
+    CAPTCHA_TIMEOUT: float = 2.0
+    CAPTCHA_CONNECT_TIMEOUT: float = 1.0
+    CAPTCHA_MAX_CONNECTIONS: int = 100
+    CAPTCHA_MAX_KEEPALIVE: int = 20
+    CAPTCHA_KEEPALIVE_EXPIRY: float = 30.0
+
+    SMS_AERO_URL: str = "https://gate.smsaero.ru/v2/sms/send"
+    SMS_TIMEOUT: float = 5.0
+    # воркер outbox'а: параллельные отправки, лимит шлюза (смс/сек), ретраи
+    SMS_WORKER_CONCURRENCY: int = 8
+    SMS_RATE_LIMIT: float = 10.0
+    SMS_MAX_ATTEMPTS: int = 5
+    SMS_RETRY_BASE_DELAY: float = 2.0
+    SMS_POLL_INTERVAL: float = 1.0
+
+    # фоновая выгрузка подписей: каталог файлов, сколько их хранить (сек),
+    # аренда задачи воркером (сек), попытки и период опроса очереди (сек)
+    EXPORT_DIR: str = "exports"
+    EXPORT_RETENTION: int = 86400
+    EXPORT_LEASE: int = 900
+    EXPORT_MAX_ATTEMPTS: int = 3
+    EXPORT_POLL_INTERVAL: float = 5.0
+
+    # как часто сверять счётчик подписей с таблицей user (сек)
+    SIGNATURE_RECONCILE_INTERVAL: int = 600
+    # число слотов шардированного счётчика и период их свёртки в voting (сек)
+    SIGNATURE_COUNTER_SHARDS: int = 16
+    SIGNATURE_FOLD_INTERVAL: int = 30
+
+    # пул для Argon2: число потоков (= одновременных хешей) и сколько ждать слота
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0
+
+    # лимиты входящих запросов: N запросов за период (сек) на IP и N выданных
+    # кодов на телефон; backend "postgres" — общий для всех воркеров uvicorn
+    RATE_LIMIT_BACKEND: Literal["memory", "postgres"] = "memory"
+    RATE_LIMIT_IP_REQUESTS: int = 20
+    RATE_LIMIT_IP_PERIOD: int = 60
+    RATE_LIMIT_PHONE_REQUESTS: int = 5
+    RATE_LIMIT_PHONE_PERIOD: int = 600
+    # X-Forwarded-For учитывается только от адресов / подсетей из
+    # RATE_LIMIT_TRUSTED_PROXIES (Caddy); без прокси заголовок игнорируется
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    RATE_LIMIT_TRUSTED_PROXIES: list[str] = ["127.0.0.1/32", "::1/128"]
+
+    # пул соединений SQLAlchemy (на процесс); DB_STATEMENT_CACHE_SIZE=0 —
+    # для PgBouncer в transaction mode
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # реплика для read-only запросов (postgresql+asyncpg://...); без неё всё
+    # читается с primary
+    DB_REPLICA_URL: Optional[str] = None
+    # сколько секунд после записи клиент читает с primary (cookie read_primary)
+    DB_READ_YOUR_WRITES_WINDOW: int = 5
+
+    # логирование: уровень, JSON-вывод и доля пропускаемых записей по уровням,
+    # например LOG_SAMPLE_RATES='{"DEBUG": 0.05}'
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+
+    # bearer-токен для /metrics (Authorization: Bearer ...); без него ручка
+    # отвечает 404
+    METRICS_TOKEN: Optional[str] = None
+
+    # кэш проверенных JWT: размер и срок жизни записи (сек)
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_CACHE_TTL: float = 60.0
+
+    # кэш второго уровня репозиториев (Admin), сек; сбрасывается
+    # записью и через LISTEN/NOTIFY во всех воркерах
+    REPO_CACHE_TTL: float = 300.0
+
+    # срок жизни закэшированного ответа /vote/vote_info (сек); верификация
+    # подписи и правки админа сбрасывают его сразу (в своём воркере)
+    VOTE_INFO_CACHE_TTL: float = 2.0
+    # Cache-Control публичных ручек чтения (/vote/vote_info) для браузеров
+    # и кэша перед бэкендом: свежесть и окно stale-while-revalidate, сек
+    PUBLIC_CACHE_MAX_AGE: int = 5
+    PUBLIC_CACHE_STALE_WHILE_REVALIDATE: int = 30
+
+    # шифрование ФИО / email / телефона в таблице user (Fernet, ключ SECRET);
+    # поиск по телефону идёт через blind index (HMAC), ключ по умолчанию
+    # выводится из SECRET
+    PII_ENCRYPTION: bool = False
+    PII_INDEX_KEY: Optional[str] = None
+
     BASE_DIR: Path = BASE_DIR
     STATIC_DIR: Path = STATIC_DIR
 
@@ -1,15 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Any, TypeAlias, TypeVar, Generic, Optional, Sequence
+from typing import Any, Mapping, TypeAlias, TypeVar, Generic, Optional, Sequence
 from uuid import UUID
 
 from sqlalchemy import ColumnElement
+from sqlalchemy.orm import QueryableAttribute
 
 from src.core.schemas import BulkCreateResult
 
 T = TypeVar("T")
 CreateT = TypeVar("CreateT")
 UpdateT = TypeVar("UpdateT")
-OrderByFields: TypeAlias = Optional[Sequence[ColumnElement[Any]]]
+# выражения или атрибуты модели (`User.created_at`)
+OrderByFields: TypeAlias = Optional[
+    Sequence[ColumnElement[Any] | QueryableAttribute[Any]]
+]
 
 
 class BaseCRUDRepository(Generic[T, CreateT, UpdateT], ABC):
@@ -51,6 +55,15 @@ class BaseCRUDRepository(Generic[T, CreateT, UpdateT], ABC):
         order_by_fields: OrderByFields,
     ) -> Sequence[T]: ...
 
+    @abstractmethod
+    async def get_page(
+        self,
+        *,
+        limit: int,
+        cursor: Optional[str],
+        filters: Optional[Mapping[str, Any]],
+    ) -> tuple[Sequence[T], Optional[str]]: ...
+
     @abstractmethod
     async def update(self, obj_id: UUID, data: UpdateT) -> Optional[T]: ...
 
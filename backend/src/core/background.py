@@ -0,0 +1,32 @@
+import asyncio
+from typing import Any, Coroutine
+
+from loguru import logger
+
+_tasks: set[asyncio.Task] = set()
+
+
+def _on_done(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task {} failed: {!r}", task.get_name(), task.exception())
+
+
+def spawn(coro: Coroutine[Any, Any, Any], name: str) -> asyncio.Task:
+    """
+    Запускает фоновую задачу, держит на неё ссылку (иначе её может собрать GC)
+    и логирует исключение, если задача упала.
+    """
+    task = asyncio.create_task(coro, name=name)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+
+async def drain(timeout: float = 10.0) -> None:
+    """Дожидается незавершённых фоновых задач при остановке приложения."""
+    if not _tasks:
+        return
+    _, pending = await asyncio.wait(set(_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
@@ -0,0 +1,58 @@
+"""
+Клиент Yandex SmartCaptcha.
+
+Один долгоживущий `httpx.AsyncClient` на процесс: пул keep-alive соединений
+(и HTTP/2, если установлен `h2`), открывается и закрывается в lifespan приложения.
+"""
+
+from importlib.util import find_spec
+from typing import Optional
+
+import httpx
+
+from src.config import settings
+from src.core.metrics import track_outbound
+
+
+class CaptchaClient:
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(
+            http2=find_spec("h2") is not None,
+            timeout=httpx.Timeout(
+                settings.CAPTCHA_TIMEOUT, connect=settings.CAPTCHA_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.CAPTCHA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CAPTCHA_MAX_KEEPALIVE,
+                keepalive_expiry=settings.CAPTCHA_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def validate(self, token: str, ip: Optional[str] = None) -> httpx.Response:
+        """
+        Проверить токен капчи.
+
+        Raises:
+            httpx.HTTPError: сетевая ошибка или таймаут.
+        """
+        if self._client is None:
+            raise RuntimeError("CaptchaClient is not started")
+
+        body = {
+            "secret": settings.YCAPTCHA_SERVER_KEY,
+            "token": token,
+            **({"ip": ip} if ip else {}),
+        }
+        with track_outbound("captcha"):
+            return await self._client.post(settings.CAPTCHA_URL, data=body)
+
+
+captcha_client = CaptchaClient()
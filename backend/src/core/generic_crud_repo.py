@@ -14,36 +14,79 @@ Subclasses must define:
   - update_schema — the Pydantic schema for update
 """
 
-from collections.abc import Sequence
+import base64
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from datetime import datetime
 from itertools import batched
 from typing import Any, Mapping, Optional, Protocol, Type, TypeVar, runtime_checkable
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn
-from sqlalchemy import Select, bindparam, delete, func, select, update
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Mapped
+from sqlalchemy import (
+    ARRAY,
+    CursorResult,
+    Executable,
+    Row,
+    Select,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    event,
+    func,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.exc import DBAPIError, IntegrityError, SQLAlchemyError
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Mapped, Mapper, Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from loguru import logger
 
 from src.core.abstract_repo import BaseCRUDRepository, OrderByFields
-from src.core.schemas import BulkCreateResult, BulkUpdateResult
-from src.vote.models import uuid_pk
+from src.core.metrics import instrument_repo_class
+from src.core.repo_cache import CHANNEL as CACHE_CHANNEL, Snapshot, repo_cache
+from src.core.ttl_cache import TTLCache
+from src.core.schemas import BulkCreateResult, BulkDeleteResult, BulkUpdateResult
+from src.database import engine
+
+# таблицы, чей кэш нужно сбросить ещё раз после коммита сессии
+_CACHE_PENDING = "repo_cache_pending"
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cache_after_commit(session: Session) -> None:
+    # между сбросом и коммитом читатель мог снова закэшировать старую строку
+    for table in session.info.pop(_CACHE_PENDING, ()):
+        repo_cache.invalidate(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_pending(session: Session) -> None:
+    session.info.pop(_CACHE_PENDING, None)
 
 
 @runtime_checkable
 class HasId(Protocol):
     """
-    Protocol that enforces the presence of `id` and attributes.
+    Protocol that enforces the presence of `id` and `created_at` attributes.
 
     Any ORM model or data class implementing this protocol must define:
         - `id`: The primary key identifier (typically an uuid)
+        - `created_at`: Creation timestamp (provided by `Base`), used for
+          keyset pagination
     """
 
-    id: Mapped[UUID] = uuid_pk()
+    id: Mapped[UUID]
+    created_at: Mapped[datetime]
 
 
 ORMModelT = TypeVar("ORMModelT", bound=HasId)
@@ -53,6 +96,25 @@ PydanticT = TypeVar("PydanticT", bound=BaseModel)
 
 _MAX_QUERY_PARAMS = 20_000
 
+# ключ кэша для результата get_all()
+_ALL = "__all__"
+
+
+def _encode_cursor(created_at: datetime, obj_id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(obj_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, obj_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(obj_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
 
 class GenericCRUDRepository(
     BaseCRUDRepository[ORMModelT, CreateSchemaT, UpdateSchemaT]
@@ -81,9 +143,75 @@ class GenericCRUDRepository(
     create_schema: type[CreateSchemaT]
     update_schema: type[UpdateSchemaT]
 
+    # кэш второго уровня для `get` / `get_all` (см. src.core.repo_cache):
+    # срок жизни записи в секундах, None — кэш выключен. Сбрасывается
+    # записью через методы репозитория; запись в обход них кэш не видит
+    cache_ttl: Optional[float] = None
+    cache_size: int = 256
+
     def __init__(self, db_session: AsyncSession) -> None:
         self.db_session = db_session
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # время методов наследников попадает в /metrics с именем репозитория
+        instrument_repo_class(cls)
+
+    @property
+    def _mapper(self) -> Mapper[Any]:
+        return sa_inspect(self.model, raiseerr=True)
+
+    @property
+    def _table_name(self) -> str:
+        return self._mapper.class_.__tablename__
+
+    async def _execute_dml(self, stmt: Executable) -> CursorResult[Any]:
+        """UPDATE / DELETE без RETURNING: результат с `rowcount`."""
+        result = await self.db_session.execute(stmt)
+        assert isinstance(result, CursorResult)
+        return result
+
+    # ============================== Cache ==============================
+    def _cache(self) -> Optional[TTLCache[Any, Any]]:
+        if self.cache_ttl is None:
+            return None
+        return repo_cache.for_table(self._table_name, self.cache_size, self.cache_ttl)
+
+    def _snapshot(self, obj: ORMModelT) -> Snapshot:
+        """Загруженные колонки объекта (отложенные и незагруженные — нет)."""
+        loaded = sa_inspect(obj, raiseerr=True).dict
+        return {
+            attr.key: loaded[attr.key]
+            for attr in self._mapper.column_attrs
+            if attr.key in loaded
+        }
+
+    async def _restore(self, snapshot: Snapshot) -> ORMModelT:
+        """Объект из снимка, подключённый к текущей сессии без запроса в БД."""
+        obj = self._mapper.class_manager.new_instance()
+        for key, value in snapshot.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return await self.db_session.merge(obj, load=False)
+
+    async def _invalidate_cache(self) -> None:
+        """
+        Сбросить кэш модели здесь — сразу и повторно после коммита — и через
+        NOTIFY после коммита текущей транзакции в остальных воркерах.
+        Вызывать после DML-оператора, который действительно изменил строки.
+        """
+        if self.cache_ttl is None:
+            return
+        table = self._table_name
+        repo_cache.invalidate(table)
+        self.db_session.info.setdefault(_CACHE_PENDING, set()).add(table)
+        # SELECT из read-сессии RoutingSession отправил бы на реплику, где
+        # слушателей primary нет, — NOTIFY всегда идёт на primary
+        await self.db_session.execute(
+            select(func.pg_notify(CACHE_CHANNEL, table)),
+            bind_arguments={"bind": engine.sync_engine},
+        )
+
     # ============================== Create ==============================
     async def create(
         self, data: CreateSchemaT, exclude_fields: Optional[list[str]] = None
@@ -101,23 +229,21 @@ class GenericCRUDRepository(
             SQLAlchemyError: If the INSERT fails for reasons other than conflict.
         """
         values = data.model_dump(exclude=set(exclude_fields or []))
-        logger.debug(f"INSERT {self.model.__name__}: {values!r}")
+        logger.debug("INSERT {}: {!r}", self.model.__name__, values)
 
         stmt = pg_insert(self.model).values(**values).returning(self.model)
         try:
             result = await self.db_session.execute(stmt)
+            await self._invalidate_cache()
             await self.db_session.commit()
             obj = result.scalar_one()
-            logger.info(f"{self.model.__name__} created: {obj!r}")
+            logger.debug("{} created: {!r}", self.model.__name__, obj)
             return obj
 
         except IntegrityError as exc:
             await self.db_session.rollback()
             logger.warning(
-                "IntegrityError on INSERT %s – %s",
-                self.model.__name__,
-                exc.orig,
-                exc_info=True,
+                "IntegrityError on INSERT {} – {}", self.model.__name__, exc.orig
             )
             raise HTTPException(
                 status_code=400,
@@ -126,7 +252,7 @@ class GenericCRUDRepository(
 
         except SQLAlchemyError as exc:
             await self.db_session.rollback()
-            logger.exception("SQLAlchemyError on INSERT", exc_info=True)
+            logger.exception("SQLAlchemyError on INSERT")
             raise
 
     async def bulk_create(
@@ -207,6 +333,7 @@ class GenericCRUDRepository(
                     data["id"] = ins["id"]
                     created.append(data)
 
+        await self._invalidate_cache()
         await self.db_session.commit()
         return BulkCreateResult(created=created, errors=errors)
 
@@ -239,137 +366,139 @@ class GenericCRUDRepository(
             )
             .values(**payload, updated_at=func.now())
         )
-        result = await self.db_session.execute(stmt)
+        result = await self._execute_dml(stmt)
+        await self._invalidate_cache()
         await self.db_session.commit()
         return result.rowcount
 
     # --------------------------------- Update Many ---------------------------------
-    async def update_many(
+    async def _apply_in_savepoint(
         self,
-        *,
-        items: Sequence[tuple[UUID, UpdateSchemaT]],
-    ) -> BulkUpdateResult:
+        rows: list[tuple[int, UUID, Any]],
+        execute: Callable[[list[tuple[int, UUID, Any]]], Awaitable[set[UUID]]],
+        errors: list[dict[str, Any]],
+    ) -> set[UUID]:
         """
-        Обходит список (id, update_schema) и вызывает update_one для каждого.
+        Выполняет пачку `execute(rows)` внутри SAVEPOINT.
 
-        Args:
-            items: Sequence of (obj_id, Pydantic‐schema) tuples.
+        Строки `(index, id, payload)`, которых нет в результате, попадают в
+        `errors` как `missing`. При ошибке БД точка сохранения откатывается,
+        а пачка повторяется по половинам, пока ошибочная строка не останется
+        одна: она попадает в `errors` как `error`, остальные применяются.
 
         Returns:
-            Суммарное количество обновлённых строк.
+            id затронутых строк.
         """
-        total = 0
-
-        errors = []
-        updated = []
-
-        # Настраиваем Progress
-        progress = Progress(
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            "[progress.percentage]{task.percentage:>3.0f}%",
-            TimeElapsedColumn(),
-        )
-        progress.start()
-        task_id = progress.add_task("Updating records...", total=len(items))
-
-        for obj_id, schema in items:
-            try:
-                total += await self.update_one(obj_id=obj_id, data=schema)
-            except Exception as exc:
-                errors.append({"obj_id": obj_id, "error": exc})
-                progress.update(task_id, advance=1)
-                continue
-
-            updated.append({"obj_id": obj_id, "updated_data": schema})
-            progress.update(task_id, advance=1)
+        try:
+            async with self.db_session.begin_nested():
+                affected = await execute(rows)
+        except DBAPIError as exc:
+            if len(rows) == 1:
+                idx, obj_id, _ = rows[0]
+                # только первая строка: в DETAIL Postgres кладёт строку целиком, с ПДн
+                detail = str(exc.orig).splitlines()[0]
+                errors.append(
+                    {"index": idx, "id": obj_id, "reason": "error", "detail": detail}
+                )
+                return set()
+            mid = len(rows) // 2
+            return await self._apply_in_savepoint(
+                rows[:mid], execute, errors
+            ) | await self._apply_in_savepoint(rows[mid:], execute, errors)
 
-        progress.stop()
-        return BulkUpdateResult(updated=updated, errors=errors)
+        for idx, obj_id, _ in rows:
+            if obj_id not in affected:
+                errors.append({"index": idx, "id": obj_id, "reason": "missing"})
+        return affected
 
-    async def __bulk_update(
+    async def update_many(
         self,
         *,
-        items: Sequence[UpdateSchemaT],
-        unique_by: Optional[tuple[str, ...]] = None,
-        update_fields: Optional[tuple[str, ...]] = None,
-        returning: Optional[tuple[str, ...]] = None,
+        items: Sequence[tuple[UUID, UpdateSchemaT]],
+        exclude_unset: bool = True,
         exclude_fields: Optional[list[str]] = None,
     ) -> BulkUpdateResult:
         """
-        WARNING: THIS METHOD DOUES NOT WORKING!
-        Bulk-update (upsert) a batch of records in a single query, splitting into sub-batches to
-        respect parameter limits.
+        Обновляет набор записей операторами `UPDATE ... FROM (VALUES ...)`
+        в одной транзакции.
+
+        Записи группируются по набору изменяемых полей, каждая группа уходит
+        пачками так, чтобы число параметров не превышало `_MAX_QUERY_PARAMS`.
+        Ошибка БД в строке не отменяет остальные (см. `_apply_in_savepoint`).
 
         Args:
-            items: schemas to update (or upsert)
-            unique_by: fields to identify conflicts (defaults to primary keys)
-            update_fields: fields to update on conflict (defaults to all non-key, non-workspace fields)
-            returning: field names for RETURNING; defaults to 'id', unique_by
-            exclude_fields: fields to drop from the payload before insert/update
+            items: пары (id, схема обновления).
+            exclude_unset: брать из схемы только явно заданные поля.
+            exclude_fields: поля, которые не обновляются; `id` не обновляется никогда.
 
         Returns:
-            BulkResult with lists of updated (or inserted) rows and errors for missing keys.
+            BulkUpdateResult: `updated` — `{"id", **поля}` обновлённых строк,
+            `errors` — `{"index", "id", "reason"}`, где reason: `missing`,
+            `duplicate` (id уже встречался), `empty` (нечего обновлять) или
+            `error` (текст ошибки в `detail`).
         """
-        if not items:
-            return BulkUpdateResult(updated=[], errors=[])
-
-        conflict_idx = unique_by or ("id",)
-
-        if returning is None:
-            returning = ("id",) + conflict_idx
-        cols_to_return = [getattr(self.model, name) for name in returning]
-
-        payload: list[dict[str, Any]] = []
-        idx_map: dict[tuple[Any, ...], int] = {}
-        for idx, item in enumerate(items):
-            row = item.model_dump(exclude=set(exclude_fields or []))
-            payload.append(row)
-            key = tuple(row[f] for f in conflict_idx)
-            idx_map[key] = idx
-
-        if update_fields is None:
-            update_fields = tuple(
-                f for f in payload[0].keys() if f not in set(conflict_idx)
-            )
-
-        # Determine batch size
-        num_cols = len(payload[0])
-        max_per_batch = _MAX_QUERY_PARAMS // num_cols or 1
-
-        updated: list[dict[str, Any]] = []
+        exclude = {"id", *(exclude_fields or ())}
         errors: list[dict[str, Any]] = []
+        groups: dict[tuple[str, ...], list[tuple[int, UUID, dict[str, Any]]]] = {}
+        seen: set[UUID] = set()
+        for idx, (obj_id, data) in enumerate(items):
+            if obj_id in seen:
+                errors.append({"index": idx, "id": obj_id, "reason": "duplicate"})
+                continue
+            seen.add(obj_id)
+            payload = data.model_dump(exclude_unset=exclude_unset, exclude=exclude)
+            if not payload:
+                errors.append({"index": idx, "id": obj_id, "reason": "empty"})
+                continue
+            groups.setdefault(tuple(sorted(payload)), []).append((idx, obj_id, payload))
 
-        for batch in batched(payload, max_per_batch):
-            batch = list(batch)
-            stmt = (
-                update(self.model)
-                .where(
-                    self.model.id == bindparam("id"),
-                )
-                .values(
-                    {field: bindparam(field) for field in update_fields},
-                )
-                .execution_options(synchronize_session=False)
-                .returning(*cols_to_return)
-            )
-
-            result = await self.db_session.execute(stmt, batch)
-            rows = result.mappings().all()
-
-            # Collect results
-            seen_keys = {tuple(r[n] for n in conflict_idx): r["id"] for r in rows}
-            for row in batch:
-                key = tuple(row[f] for f in conflict_idx)
-                orig_idx = idx_map[key]
-                if key in seen_keys:
-                    updated.append({**row, "id": seen_keys[key]})
-                else:
-                    lookup = {f: row[f] for f in conflict_idx}
-                    errors.append({"index": orig_idx, **lookup, "reason": "missing"})
+        columns = self._mapper.columns
+        updated: list[dict[str, Any]] = []
+        try:
+            for fields, rows in groups.items():
+
+                async def execute(batch, fields=fields) -> set[UUID]:
+                    source = values(
+                        column("id", columns["id"].type),
+                        *(column(name, columns[name].type) for name in fields),
+                        name="source",
+                    ).data(
+                        [(obj_id, *(row[f] for f in fields)) for _, obj_id, row in batch]
+                    )
+                    # тип колонки VALUES Postgres выводит из первой строки, и
+                    # NULL там становится text — приводим явно. updated_at
+                    # выставит onupdate колонки
+                    stmt = (
+                        update(self.model)
+                        .where(self.model.id == source.c.id)
+                        .values(
+                            {
+                                name: cast(source.c[name], columns[name].type)
+                                for name in fields
+                            }
+                        )
+                        .returning(self.model.id)
+                        .execution_options(synchronize_session=False)
+                    )
+                    return set((await self.db_session.execute(stmt)).scalars())
+
+                batch_size = _MAX_QUERY_PARAMS // (len(fields) + 1) or 1
+                for batch in batched(rows, batch_size):
+                    affected = await self._apply_in_savepoint(list(batch), execute, errors)
+                    updated.extend(
+                        {"id": obj_id, **row}
+                        for _, obj_id, row in batch
+                        if obj_id in affected
+                    )
+
+            await self._invalidate_cache()
+            await self.db_session.commit()
+        except SQLAlchemyError:
+            await self.db_session.rollback()
+            logger.exception("SQLAlchemyError on bulk UPDATE {}", self.model.__name__)
+            raise
 
-        await self.db_session.commit()
-        self.db_session.expire_all()
+        errors.sort(key=lambda e: e["index"])
         return BulkUpdateResult(updated=updated, errors=errors)
 
     async def get_or_create(
@@ -400,6 +529,7 @@ class GenericCRUDRepository(
 
         stmt = pg_insert(self.model).values(**data).returning(self.model)
         result = await self.db_session.execute(stmt)
+        await self._invalidate_cache()
         await self.db_session.commit()
         new = result.scalar_one()
 
@@ -437,6 +567,7 @@ class GenericCRUDRepository(
             .returning(self.model)
         )
         result = await self.db_session.execute(stmt)
+        await self._invalidate_cache()
         await self.db_session.commit()
         return result.scalar_one()
 
@@ -451,11 +582,20 @@ class GenericCRUDRepository(
         Returns:
             The ORM instance if found, or `None` otherwise.
         """
+        cache = self._cache()
+        if cache is not None:
+            snapshot = cache.get(obj_id)
+            if snapshot is not None:
+                return await self._restore(snapshot)
+
         stmt = select(self.model).where(
             self.model.id == obj_id,
         )
         result = await self.db_session.execute(stmt)
-        return result.scalar_one_or_none()
+        obj = result.scalar_one_or_none()
+        if cache is not None and obj is not None:
+            cache.put(obj_id, self._snapshot(obj))
+        return obj
 
     async def get_or_404(self, obj_id: UUID) -> ORMModelT:
         """
@@ -506,6 +646,56 @@ class GenericCRUDRepository(
 
         return result.scalars().all()
 
+    async def get_page(
+        self,
+        *,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[Mapping[str, Any]] = None,
+    ) -> tuple[Sequence[ORMModelT], Optional[str]]:
+        """
+        Retrieve one page of records, newest first, using keyset pagination.
+
+        Records are ordered by `(created_at, id)` descending and the page starts
+        strictly after the row encoded in *cursor*, so every page costs one index
+        range scan no matter how deep it is (unlike LIMIT/OFFSET).
+
+        Args:
+            limit: Page size.
+            cursor: Opaque cursor returned with the previous page, or None for
+                the first page.
+            filters: Passed to :pymeth:`_apply_filters`.
+
+        Returns:
+            A tuple `(items, next_cursor)`; `next_cursor` is None on the last page.
+
+        Raises:
+            HTTPException(400) if the cursor cannot be decoded.
+        """
+        key = tuple_(self.model.created_at, self.model.id)
+        stmt = await self._apply_filters(select(self.model), filters)
+        if cursor:
+            created_at, obj_id = _decode_cursor(cursor)
+            stmt = stmt.where(
+                key
+                < tuple_(
+                    literal(created_at, self.model.created_at.type),
+                    literal(obj_id, self.model.id.type),
+                )
+            )
+        stmt = stmt.order_by(
+            self.model.created_at.desc(), self.model.id.desc()
+        ).limit(limit + 1)
+
+        result = await self.db_session.execute(stmt)
+        items = result.scalars().all()
+        if len(items) <= limit:
+            return items, None
+
+        items = items[:limit]
+        last = items[-1]
+        return items, _encode_cursor(last.created_at, last.id)
+
     async def get_all(
         self, response_model: Optional[Type[PydanticT]] = None
     ) -> Sequence[ORMModelT] | list[PydanticT]:
@@ -526,15 +716,53 @@ class GenericCRUDRepository(
             rows = result.mappings().all()
             return [response_model.model_validate(row) for row in rows]
         else:
+            cache = self._cache()
+            if cache is not None:
+                snapshots = cache.get(_ALL)
+                if snapshots is not None:
+                    return [await self._restore(snapshot) for snapshot in snapshots]
+
             stmt = select(self.model)
             result = await self.db_session.execute(stmt)
-            return result.scalars().all()
+            objs = result.scalars().all()
+            if cache is not None:
+                cache.put(_ALL, [self._snapshot(obj) for obj in objs])
+            return objs
+
+    async def stream(
+        self,
+        *columns: Any,
+        order_by_fields: OrderByFields = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row[Any]]:
+        """
+        Stream rows through a server-side cursor, `batch_size` rows per fetch.
+
+        Only the requested columns are selected (the whole model if none are
+        given), so memory stays flat regardless of table size. The session is
+        busy until the iterator is exhausted or closed.
+
+        Args:
+            columns: model attributes to select.
+            order_by_fields: optional ORDER BY.
+            batch_size: rows per round trip (`yield_per`).
+        """
+        stmt = select(*columns) if columns else select(self.model)
+        if order_by_fields:
+            stmt = stmt.order_by(*order_by_fields)
+
+        result = await self.db_session.stream(
+            stmt.execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row
 
     # ------------------------------ Update ------------------------------
     async def update(
         self,
         obj_id: UUID,
         data: UpdateSchemaT,
+        exclude_fields: Optional[list[str]] = None,
     ) -> Optional[ORMModelT]:
         """
         Update a single record’s fields.
@@ -545,6 +773,7 @@ class GenericCRUDRepository(
         Args:
             `obj_id`: The primary key of the record to update.
             data: The Pydantic schema instance with fields to change.
+            exclude_fields: fields to drop from the payload before update.
 
         Returns:
             True if exactly one row was updated; False if no rows were matched
@@ -555,10 +784,11 @@ class GenericCRUDRepository(
             .where(
                 self.model.id == obj_id,
             )
-            .values(**data.model_dump())
+            .values(**data.model_dump(exclude=set(exclude_fields or [])))
             .returning(self.model)
         )
         result = await self.db_session.execute(stmt)
+        await self._invalidate_cache()
         await self.db_session.commit()
         return result.scalar_one()
 
@@ -593,7 +823,8 @@ class GenericCRUDRepository(
             .values(**payload)
         )
 
-        result = await self.db_session.execute(stmt)
+        result = await self._execute_dml(stmt)
+        await self._invalidate_cache()
         await self.db_session.commit()
         return result.rowcount
 
@@ -615,10 +846,67 @@ class GenericCRUDRepository(
             self.model.id == obj_id,
         )
 
-        result = await self.db_session.execute(stmt)
+        result = await self._execute_dml(stmt)
+        await self._invalidate_cache()
         await self.db_session.commit()
         return result.rowcount == 1
 
+    async def delete_many(
+        self,
+        *,
+        obj_ids: Sequence[UUID],
+    ) -> BulkDeleteResult:
+        """
+        Удаляет записи операторами `DELETE ... WHERE id = ANY(:ids)` в одной
+        транзакции, по `_MAX_QUERY_PARAMS` id на оператор. Ошибка БД в строке
+        (например, нарушение FK) не отменяет остальные удаления.
+
+        Args:
+            `obj_ids`: первичные ключи удаляемых записей.
+
+        Returns:
+            BulkDeleteResult: `deleted` — удалённые id, `errors` —
+            `{"index", "id", "reason"}` с reason `missing`, `duplicate` или
+            `error` (текст ошибки в `detail`).
+        """
+        errors: list[dict[str, Any]] = []
+        rows: list[tuple[int, UUID, None]] = []
+        seen: set[UUID] = set()
+        for idx, obj_id in enumerate(obj_ids):
+            if obj_id in seen:
+                errors.append({"index": idx, "id": obj_id, "reason": "duplicate"})
+                continue
+            seen.add(obj_id)
+            rows.append((idx, obj_id, None))
+
+        ids_type = ARRAY(self._mapper.columns["id"].type)
+
+        async def execute(batch) -> set[UUID]:
+            ids = bindparam("ids", [obj_id for _, obj_id, _ in batch], type_=ids_type)
+            stmt = (
+                delete(self.model)
+                .where(self.model.id == any_(ids))
+                .returning(self.model.id)
+                .execution_options(synchronize_session=False)
+            )
+            return set((await self.db_session.execute(stmt)).scalars())
+
+        deleted: list[UUID] = []
+        try:
+            for batch in batched(rows, _MAX_QUERY_PARAMS):
+                affected = await self._apply_in_savepoint(list(batch), execute, errors)
+                deleted.extend(obj_id for _, obj_id, _ in batch if obj_id in affected)
+
+            await self._invalidate_cache()
+            await self.db_session.commit()
+        except SQLAlchemyError:
+            await self.db_session.rollback()
+            logger.exception("SQLAlchemyError on bulk DELETE {}", self.model.__name__)
+            raise
+
+        errors.sort(key=lambda e: e["index"])
+        return BulkDeleteResult(deleted=deleted, errors=errors)
+
     # ============================== Utils ==============================
     async def exists(
         self,
@@ -673,3 +961,6 @@ class GenericCRUDRepository(
         if filters:
             return stmt.filter_by(**filters)
         return stmt
+
+
+instrument_repo_class(GenericCRUDRepository)
@@ -0,0 +1,104 @@
+"""
+Условные запросы для публичных ручек чтения: `ETag`, `Last-Modified`,
+`Cache-Control` и ответ `304 Not Modified`.
+
+Валидаторы считаются один раз при загрузке ответа и хранятся рядом с телом
+в `CachedResponse`, поэтому проверка `If-None-Match` / `If-Modified-Since`
+сводится к сравнению строк — без запроса в БД и сериализации.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Mapping
+
+from starlette.responses import Response
+
+
+def cache_control(max_age: int, stale_while_revalidate: int) -> str:
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+
+def _as_utc(value: datetime) -> datetime:
+    # TIMESTAMP без зоны в БД хранит UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """Готовое тело ответа вместе с его валидаторами."""
+
+    body: bytes
+    etag: str
+    last_modified: datetime
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        body: bytes,
+        version: Iterable[Any],
+        last_modified: datetime,
+        cache_control: str,
+    ) -> "CachedResponse":
+        """
+        Args:
+            body: сериализованный ответ.
+            version: значения, от которых зависит тело (id и версия строки,
+                счётчик); одинаковые значения дают одинаковый сильный ETag.
+            last_modified: время последнего изменения данных.
+            cache_control: значение заголовка `Cache-Control`.
+        """
+        digest = hashlib.blake2b(
+            "|".join(map(str, version)).encode(), digest_size=12
+        ).hexdigest()
+        etag = f'"{digest}"'
+        last_modified = _as_utc(last_modified)
+        headers = {
+            "etag": etag,
+            "last-modified": format_datetime(last_modified, usegmt=True),
+            "cache-control": cache_control,
+        }
+        return cls(body, etag, last_modified, headers)
+
+    def is_not_modified(self, request_headers: Mapping[str, str]) -> bool:
+        """
+        RFC 9110, 13.2.2: если есть `If-None-Match`, `If-Modified-Since`
+        игнорируется. `If-None-Match` сравнивается слабо — прокси со сжатием
+        помечают ETag как `W/`.
+        """
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            return any(
+                tag.strip().removeprefix("W/") == self.etag
+                for tag in if_none_match.split(",")
+            )
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified <= since
+        return False
+
+    def to_response(
+        self,
+        request_headers: Mapping[str, str],
+        media_type: str = "application/json",
+    ) -> Response:
+        """`304` без тела, если клиентская копия актуальна, иначе `200`."""
+        if self.is_not_modified(request_headers):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type=media_type, headers=self.headers)
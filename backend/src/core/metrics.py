@@ -0,0 +1,216 @@
+"""
+Метрики процесса в текстовом формате Prometheus (`GET /metrics`).
+
+Все обновления идут из одного event loop и сводятся к `+=` над словарём,
+поэтому блокировок нет: инструментирование не становится узким местом.
+Значения живут в памяти процесса — при нескольких воркерах uvicorn каждый
+отдаёт свои, Prometheus различает их по `instance`/порту.
+"""
+
+import bisect
+from abc import ABC, abstractmethod
+import functools
+import inspect
+import time
+from collections.abc import Callable, Sequence
+from contextlib import contextmanager
+from typing import Iterator, TypeVar
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.label_names = tuple(labels)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.type_name}"]
+
+    @abstractmethod
+    def render(self) -> list[str]: ...
+
+
+MetricT = TypeVar("MetricT", bound=Metric)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, doc, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        doc: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        # [счётчики по бакетам (не накопительные) + +Inf, сумма]
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                labels = _labels(self.label_names, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {total[0]!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class GaugeFunc(Metric):
+    """Gauge, значение которого читается функцией в момент выгрузки."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, doc: str, func: Callable[[], float]) -> None:
+        super().__init__(name, doc)
+        self.func = func
+
+    def render(self) -> list[str]:
+        return [f"{self.name} {_number(self.func())}"]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: MetricT) -> MetricT:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, doc: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, doc, labels))
+
+    def histogram(
+        self,
+        name: str,
+        doc: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, doc, labels, buckets))
+
+    def gauge_func(self, name: str, doc: str, func: Callable[[], float]) -> GaugeFunc:
+        return self._register(GaugeFunc(name, doc, func))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route and status",
+    ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+outbound_duration = registry.histogram(
+    "outbound_request_duration_seconds", "Captcha / SMS gateway latency", ("service",)
+)
+outbound_errors = registry.counter(
+    "outbound_request_errors_total", "Failed captcha / SMS gateway calls", ("service",)
+)
+repo_duration = registry.histogram(
+    "repository_call_duration_seconds",
+    "GenericCRUDRepository method latency",
+    ("repo", "method"),
+)
+
+
+@contextmanager
+def track_outbound(service: str) -> Iterator[None]:
+    """Время и ошибки вызова внешнего сервиса (`captcha`, `sms`)."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        outbound_errors.inc(service)
+        raise
+    finally:
+        outbound_duration.observe(time.perf_counter() - started, service)
+
+
+def timed_repo_method(method: str, func):
+    """Обёртка корутины репозитория, пишущая `repository_call_duration_seconds`."""
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            repo_duration.observe(
+                time.perf_counter() - started, type(self).__name__, method
+            )
+
+    return wrapper
+
+
+def instrument_repo_class(cls: type) -> None:
+    """Обернуть публичные корутины, объявленные в самом `cls`."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.iscoroutinefunction(value):
+            continue
+        setattr(cls, attr, timed_repo_method(attr, value))
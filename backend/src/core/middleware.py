@@ -0,0 +1,150 @@
+"""
+Единый pure-ASGI middleware вместо трёх `@app.middleware("http")`.
+
+`BaseHTTPMiddleware` на каждый запрос заводит отдельную задачу и пропускает
+тело ответа через memory stream — это заметно на коротких ручках и ломает
+потоковую отдачу (выгрузка в Excel). Здесь фильтрация, лимит по IP,
+заголовки безопасности, access-лог и метрики запросов делаются за один проход, а ответ
+уходит клиенту напрямую через `send`.
+"""
+
+import json
+import time
+from typing import Iterable, Optional
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.core.metrics import http_request_duration, http_requests
+from src.core.rate_limit import forwarded_client, rate_limiter
+
+BLOCKED_AGENTS = (b"wget", b"python", b"scanner", b"bot")
+
+RATE_LIMITED_PATHS = frozenset(("/vote/validate", "/vote/verify_sms", "/auth/login"))
+
+SECURITY_HEADERS = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+)
+
+
+def _header(scope: Scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _client_ip(scope: Scope) -> Optional[str]:
+    """То же, что `rate_limit.client_ip`, но без построения `Request`."""
+    forwarded_for = _header(scope, b"x-forwarded-for")
+    client = scope.get("client")
+    return forwarded_client(
+        client[0] if client else None,
+        forwarded_for.decode("latin-1") if forwarded_for else None,
+    )
+
+
+class RequestGuardMiddleware:
+    """
+    Фильтр запросов + лимит по IP + заголовки безопасности + access-лог.
+
+    Дополнительные заголовки можно передать через `extra_headers`; они
+    добавляются к каждому HTTP-ответу вместе с `SECURITY_HEADERS`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        extra_headers: Iterable[tuple[bytes, bytes]] = (),
+    ) -> None:
+        self.app = app
+        self.headers = SECURITY_HEADERS + tuple(extra_headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        headers = self.headers
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()), *headers]
+            await send(message)
+
+        try:
+            rejected = await self._reject(scope)
+            if rejected is not None:
+                await self._respond(send_wrapper, *rejected)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            logger.error("Request failed: {}", e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            # шаблон пути, а не сам путь — иначе кардинальность меток не ограничена
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            http_requests.inc(scope["method"], route_path, str(status_code))
+            http_request_duration.observe(elapsed, scope["method"], route_path)
+            logger.info(
+                "Request: {} {} from {} -> {} in {:.1f}ms",
+                scope["method"],
+                scope["path"],
+                _client_ip(scope) or "unknown",
+                status_code,
+                elapsed * 1000,
+            )
+
+    async def _reject(self, scope: Scope) -> Optional[tuple[int, str, tuple]]:
+        """Причина отказа `(status, detail, headers)` или None."""
+        method = scope["method"]
+        # Блокировка CONNECT запросов
+        if method == "CONNECT":
+            return 405, "Method not allowed", ()
+
+        # Блокировка прокси запросов
+        path = scope["path"]
+        if path.startswith("http"):
+            return 400, "Bad request", ()
+
+        # Блокировка подозрительных User-Agent
+        user_agent = (_header(scope, b"user-agent") or b"").lower()
+        if any(agent in user_agent for agent in BLOCKED_AGENTS):
+            return 403, "Forbidden", ()
+
+        # Лимит запросов с одного IP на ручки, которые дёргают капчу, SMS и Argon2
+        if method == "POST" and path in RATE_LIMITED_PATHS:
+            allowed = await rate_limiter.hit(
+                f"ip:{_client_ip(scope)}",
+                settings.RATE_LIMIT_IP_REQUESTS,
+                settings.RATE_LIMIT_IP_PERIOD,
+            )
+            if not allowed:
+                retry_after = str(settings.RATE_LIMIT_IP_PERIOD).encode()
+                return 429, "Too many requests", ((b"retry-after", retry_after),)
+        return None
+
+    @staticmethod
+    async def _respond(send: Send, status_code: int, detail: str, headers) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,22 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+
+async def run_periodic(
+    func: Callable[[], Awaitable[object]],
+    interval: float,
+) -> None:
+    """
+    Вызывает `func` сразу и затем каждые `interval` секунд, пока задачу не отменят.
+    Ошибки логируются и не останавливают цикл.
+    """
+    while True:
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error("Periodic job {} failed: {}", func.__name__, exc)
+        await asyncio.sleep(interval)
@@ -0,0 +1,226 @@
+"""
+Ограничение частоты запросов.
+
+* `TokenBucket` — исходящие вызовы внутри процесса (лимиты SMS-шлюза).
+* `RateLimiter` — входящие запросы по ключу (IP, телефон): скользящее окно,
+  приближённое двумя фиксированными окнами (`prev * (1 - доля прошедшего) + cur`).
+  Бэкенд `memory` считает в памяти процесса, `postgres` — в UNLOGGED-таблице,
+  общей для всех воркеров uvicorn.
+"""
+
+import asyncio
+import ipaddress
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import BigInteger, Column, Integer, Table, Text, delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.config import settings
+from src.database import Base, blind_index, engine
+
+
+class TokenBucket:
+    """
+    Token bucket для одного процесса: `rate` токенов в секунду, ёмкость `burst`.
+
+    Работает в пределах одного event loop — проверка и списание токенов
+    происходят без `await` между ними, поэтому блокировки не нужны.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Списать токены, если их хватает. Не ждёт."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Дождаться и списать токены."""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+rate_limit_table = Table(
+    "rate_limit",
+    Base.metadata,
+    Column("key", Text, primary_key=True),
+    Column("window", BigInteger, primary_key=True),
+    Column("hits", Integer, nullable=False),
+    prefixes=["UNLOGGED"],
+)
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def incr(self, key: str, window: int, period: int) -> tuple[int, int]:
+        """
+        Засчитать попадание в окно, начинающееся в `window` (unix-время,
+        кратное `period`); вернуть (счётчик предыдущего окна, текущего).
+        """
+
+    @abstractmethod
+    async def cleanup(self, before: int) -> None:
+        """Удалить окна, начавшиеся раньше `before` (unix-время)."""
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Счётчики в памяти процесса, разбитые на шарды по хешу ключа, чтобы чистка
+    устаревших окон шла небольшими порциями, а не по одному большому словарю.
+    """
+
+    def __init__(self, shards: int = 64) -> None:
+        self._shards: list[dict[tuple[str, int], int]] = [{} for _ in range(shards)]
+
+    def _shard(self, key: str) -> dict[tuple[str, int], int]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    async def incr(self, key: str, window: int, period: int) -> tuple[int, int]:
+        shard = self._shard(key)
+        current = shard.get((key, window), 0) + 1
+        shard[(key, window)] = current
+        return shard.get((key, window - period), 0), current
+
+    async def cleanup(self, before: int) -> None:
+        for shard in self._shards:
+            for stale in [k for k in shard if k[1] < before]:
+                del shard[stale]
+            await asyncio.sleep(0)
+
+
+class PostgresBackend(RateLimitBackend):
+    """Счётчики в UNLOGGED-таблице `rate_limit`: один round trip на попадание."""
+
+    async def incr(self, key: str, window: int, period: int) -> tuple[int, int]:
+        insert = pg_insert(rate_limit_table).values(key=key, window=window, hits=1)
+        current = (
+            insert.on_conflict_do_update(
+                index_elements=["key", "window"],
+                set_={"hits": rate_limit_table.c.hits + 1},
+            )
+            .returning(rate_limit_table.c.hits)
+            .cte("current")
+        )
+        previous = (
+            select(rate_limit_table.c.hits)
+            .where(
+                rate_limit_table.c.key == key,
+                rate_limit_table.c.window == window - period,
+            )
+            .scalar_subquery()
+        )
+        stmt = select(previous, current.c.hits)
+        async with engine.begin() as conn:
+            prev, cur = (await conn.execute(stmt)).one()
+        return prev or 0, cur
+
+    async def cleanup(self, before: int) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(
+                delete(rate_limit_table).where(rate_limit_table.c.window < before)
+            )
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+
+    async def hit(self, key: str, limit: int, period: int) -> bool:
+        """
+        Засчитать запрос по ключу. False — лимит `limit` запросов за `period`
+        секунд превышен.
+        """
+        now = time.time()
+        elapsed = now % period
+        window = int(now - elapsed)
+        prev, cur = await self.backend.incr(f"{period}:{key}", window, period)
+        return prev * (1 - elapsed / period) + cur <= limit
+
+    async def cleanup(self) -> None:
+        longest = max(settings.RATE_LIMIT_IP_PERIOD, settings.RATE_LIMIT_PHONE_PERIOD)
+        await self.backend.cleanup(int(time.time()) - 2 * longest)
+
+
+TRUSTED_PROXIES = tuple(
+    ipaddress.ip_network(network, strict=False)
+    for network in settings.RATE_LIMIT_TRUSTED_PROXIES
+)
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def forwarded_client(
+    peer: Optional[str], forwarded_for: Optional[str]
+) -> Optional[str]:
+    """
+    IP клиента по адресу соединения `peer` и заголовку X-Forwarded-For.
+
+    Заголовку верим, только если соединение пришло от доверенного прокси.
+    Левые адреса клиент может подставить сам, поэтому цепочка проходится
+    справа налево: первый недоверенный адрес дописал наш прокси — это и
+    есть клиент.
+    """
+    if (
+        not forwarded_for
+        or not settings.RATE_LIMIT_TRUST_FORWARDED
+        or peer is None
+        or not _is_trusted_proxy(peer)
+    ):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """IP клиента; за доверенным прокси — из X-Forwarded-For."""
+    return forwarded_client(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+    )
+
+
+async def limit_phone(phone: str) -> None:
+    """
+    Лимит выдачи кодов (/vote/validate) на номер; ключ — blind index, чтобы
+    не хранить номер. Попытки ввода кода считаются отдельно, на самом коде.
+    """
+    allowed = await rate_limiter.hit(
+        f"phone:sms:{blind_index(phone).hex()}",
+        settings.RATE_LIMIT_PHONE_REQUESTS,
+        settings.RATE_LIMIT_PHONE_PERIOD,
+    )
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(settings.RATE_LIMIT_PHONE_PERIOD)},
+        )
+
+
+rate_limiter = RateLimiter(
+    PostgresBackend() if settings.RATE_LIMIT_BACKEND == "postgres" else MemoryBackend()
+)
@@ -0,0 +1,93 @@
+"""
+Кэш второго уровня для `GenericCRUDRepository.get` / `get_all`.
+
+Включается на репозитории атрибутом `cache_ttl`. В кэше лежат не ORM-объекты,
+а снимки загруженных колонок: при попадании из снимка собирается новый
+объект и подключается к сессии вызывающего без запроса в БД.
+
+Запись через репозиторий сбрасывает кэш модели локально и шлёт
+`NOTIFY repo_cache, '<таблица>'` в той же транзакции — после коммита
+остальные воркеры (и реплики приложения) получают его через `LISTEN` и
+сбрасывают свои копии.
+"""
+
+import asyncio
+from typing import Any, Optional
+
+import asyncpg
+from loguru import logger
+
+from src.core.ttl_cache import TTLCache
+
+CHANNEL = "repo_cache"
+
+# снимок объекта: {атрибут: значение}
+Snapshot = dict[str, Any]
+
+
+class RepoCache:
+    """Кэши по таблицам + слушатель инвалидаций из Postgres."""
+
+    def __init__(self) -> None:
+        self._caches: dict[str, TTLCache[Any, Any]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def for_table(self, table: str, maxsize: int, ttl: float) -> TTLCache[Any, Any]:
+        cache = self._caches.get(table)
+        if cache is None:
+            cache = self._caches[table] = TTLCache(maxsize=maxsize, ttl=ttl)
+        return cache
+
+    def invalidate(self, table: str) -> None:
+        cache = self._caches.get(table)
+        if cache is not None:
+            cache.clear()
+
+    def invalidate_all(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {table: cache.stats() for table, cache in self._caches.items()}
+
+    # ----------------------------- LISTEN / NOTIFY -----------------------------
+    def start(self, dsn: str, reconnect_delay: float = 5.0) -> None:
+        self._listener = asyncio.create_task(self._listen(dsn, reconnect_delay))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str) -> None:
+        self.invalidate(payload)
+
+    async def _listen(self, dsn: str, reconnect_delay: float) -> None:
+        """
+        Отдельное соединение asyncpg (не из пула SQLAlchemy) под `LISTEN`.
+        Пока соединения нет, уведомления теряются, поэтому после
+        переподключения кэш сбрасывается целиком.
+        """
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+                self.invalidate_all()
+                await closed.wait()
+                logger.warning("Repo cache listener connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("Repo cache listener failed: {!r}", exc)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            self.invalidate_all()
+            await asyncio.sleep(reconnect_delay)
+
+
+repo_cache = RepoCache()
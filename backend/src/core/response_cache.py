@@ -0,0 +1,58 @@
+"""
+Кэш готового ответа с объединением одновременных промахов.
+
+После истечения TTL первый запрос запускает загрузку, остальные ждут тот же
+future — в БД уходит один запрос, сколько бы клиентов ни пришло разом.
+`invalidate()` сбрасывает значение и поколение: загрузка, начатая до сброса,
+отдаётся уже ждущим её запросам, но в кэш не попадает.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ResponseCache(Generic[T]):
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._value: Optional[T] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._inflight: Optional[asyncio.Future[T]] = None
+
+    async def get_or_load(self, loader: Callable[[], Awaitable[T]]) -> T:
+        if self._value is not None and self._expires_at > time.monotonic():
+            self.hits += 1
+            return self._value
+
+        self.misses += 1
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._load(loader))
+        # shield: отмена одного ожидающего не отменяет загрузку для остальных
+        return await asyncio.shield(self._inflight)
+
+    async def _load(self, loader: Callable[[], Awaitable[T]]) -> T:
+        generation = self._generation
+        try:
+            value = await loader()
+        finally:
+            if self._inflight is asyncio.current_task():
+                self._inflight = None
+        if generation == self._generation:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self) -> None:
+        self._value = None
+        self._generation += 1
+        # следующий запрос начнёт свежую загрузку, не дожидаясь устаревшей
+        self._inflight = None
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -1,4 +1,5 @@
 from typing import Any, Optional
+from uuid import UUID
 from pydantic import BaseModel
 
 
@@ -12,6 +13,11 @@ class BulkUpdateResult(BaseModel):
     errors: list[dict[str, Any]]
 
 
+class BulkDeleteResult(BaseModel):
+    deleted: list[UUID]
+    errors: list[dict[str, Any]]
+
+
 class ResponseSchema(BaseModel):
     data: Optional[list[dict[str, Any]]] = None
     message: Optional[str] = None
@@ -1,13 +1,21 @@
+import hashlib
+import hmac
 import re
 import uuid
 from datetime import datetime
-from typing import Annotated, Optional
+from typing import Annotated, Iterable, Optional
 from cryptography.fernet import Fernet
 
-from sqlalchemy import Dialect, func, TIMESTAMP
+from sqlalchemy import BigInteger, Dialect, Select, func, TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncAttrs
-from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
+from sqlalchemy.ext.asyncio import (
+    AsyncAttrs,
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import DeclarativeBase, Session, declared_attr, Mapped, mapped_column
+from sqlalchemy.sql.dml import UpdateBase
 
 from sqlalchemy.types import VARCHAR, TypeDecorator
 
@@ -16,13 +24,70 @@ from src.config import get_db_url, settings
 
 DATABASE_URL = get_db_url()
 
-engine = create_async_engine(DATABASE_URL)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+# ключ в `Session.info`: сессия может читать с реплики
+READ_REPLICA = "read_replica"
+
+
+def make_engine(url: str) -> AsyncEngine:
+    """Движок с настройками пула и кэша prepared statements из `Settings`."""
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # кэш asyncpg и кэш диалекта SQLAlchemy поверх него
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+engine = make_engine(DATABASE_URL)
+replica_engine = make_engine(settings.DB_REPLICA_URL) if settings.DB_REPLICA_URL else None
+
+
+class RoutingSession(Session):
+    """
+    Сессия, которая отправляет чтение на реплику, а всё остальное — на primary.
+
+    На реплику идут только простые SELECT (без FOR UPDATE) в сессиях с
+    `info[READ_REPLICA]`. Первая же запись переключает сессию на primary до
+    конца её жизни — последующие чтения видят собственные изменения
+    (read-your-writes).
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if replica_engine is not None and self.info.get(READ_REPLICA):
+            if (
+                not self._flushing
+                and isinstance(clause, Select)
+                and clause._for_update_arg is None
+            ):
+                return replica_engine.sync_engine
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info[READ_REPLICA] = False
+        return engine.sync_engine
+
+
+async_session_maker = async_sessionmaker(
+    engine, expire_on_commit=False, sync_session_class=RoutingSession
+)
+
 
 async def get_async_session():
     async with async_session_maker() as session:
         yield session
 
+
+async def get_async_read_session(replica: bool = True):
+    """Сессия для read-only ручек: чтение с реплики, если она настроена."""
+    async with async_session_maker(info={READ_REPLICA: replica}) as session:
+        yield session
+
+
 # ----------------- Настройка аннотаций для базы данных. -----------------
 int_pk = Annotated[int, mapped_column(primary_key=True, unique=True)]
 created_at = Annotated[datetime, mapped_column(server_default=func.now())]
@@ -64,6 +129,42 @@ class Base(AsyncAttrs, DeclarativeBase):
 
 fernet = Fernet(settings.SECRET.encode())
 
+# все токены Fernet начинаются с байта версии 0x80 -> "gAAAAA" в base64
+_FERNET_PREFIX = "gAAAAA"
+
+_blind_index_key = (
+    settings.PII_INDEX_KEY.encode()
+    if settings.PII_INDEX_KEY
+    else hmac.new(settings.SECRET.encode(), b"blind-index", hashlib.sha256).digest()
+)
+
+
+def blind_index(value: str) -> bytes:
+    """
+    Детерминированный HMAC-SHA256 значения — для поиска на равенство
+    и уникальности по зашифрованным колонкам.
+    """
+    return hmac.new(_blind_index_key, value.strip().encode(), hashlib.sha256).digest()
+
+
+def decrypt_many(values: Iterable[Optional[str]]) -> list[Optional[str]]:
+    """
+    Пакетная расшифровка. Значения, не похожие на токен Fernet (записанные
+    до включения PII_ENCRYPTION), возвращаются как есть.
+    """
+    return [
+        fernet.decrypt(v.encode()).decode()
+        if v is not None and v.startswith(_FERNET_PREFIX)
+        else v
+        for v in values
+    ]
+
+
+def encrypt_many(values: Iterable[Optional[str]]) -> list[Optional[str]]:
+    """Пакетное шифрование (для записи в обход ORM, например через COPY)."""
+    return [fernet.encrypt(v.encode()).decode() if v is not None else None for v in values]
+
+
 class EncryptedString(TypeDecorator[str]):
     """
     Кастомный тип данных для SQLAlchemy, который автоматически шифрует и дешифрует строковые значения.
@@ -91,5 +192,59 @@ class EncryptedString(TypeDecorator[str]):
         return decrypted
 
 
+class PiiString(EncryptedString):
+    """
+    `EncryptedString` для персональных данных, управляемый настройкой
+    `PII_ENCRYPTION`: при выключенной настройке значения пишутся открытым
+    текстом. Чтение понимает оба варианта, поэтому включать шифрование можно
+    на живой базе.
+    """
+
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect: Dialect):
+        if not settings.PII_ENCRYPTION:
+            return value
+        return super().process_bind_param(value, dialect)
+
+    def process_result_value(self, value: Optional[str], dialect: Dialect):
+        if value is None or not value.startswith(_FERNET_PREFIX):
+            return value
+        return super().process_result_value(value, dialect)
+
+
+# E.164: код страны и номер, до 15 цифр, без ведущего нуля
+_E164_RE = re.compile(r"^\+?([1-9]\d{0,14})$")
+
 
+def phone_to_int(value: str) -> int:
+    """
+    `+79991234567` -> `79991234567`. Для записи в обход ORM (COPY);
+    ORM делает то же через `PhoneNumber`.
+    """
+    match = _E164_RE.fullmatch(value.strip())
+    if match is None:
+        # сам номер в сообщение не попадает: оно уходит в логи
+        raise ValueError("Phone number is not in E.164 format")
+    return int(match.group(1))
+
+
+class PhoneNumber(TypeDecorator[str]):
+    """
+    Телефон в E.164, хранится как BIGINT: 8 байт вместо строки, сравнение и
+    индекс — по целому. Снаружи это та же строка с `+`, что и раньше;
+    разбор — при записи, форматирование — при чтении.
+    """
+
+    cache_ok = True
+    impl = BigInteger
 
+    def process_bind_param(self, value: Optional[str], dialect: Dialect):
+        if value is None:
+            return value
+        return phone_to_int(value)
+
+    def process_result_value(self, value: Optional[int], dialect: Dialect):
+        if value is None:
+            return value
+        return f"+{value}"
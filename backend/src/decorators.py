@@ -15,7 +15,7 @@ def safe_call_async(debug: Optional[bool] = True):
                 return await func(*args, **kwargs)
             except Exception as e:
                 if debug:
-                    logger.error(f"Error when calling the function {func.__name__}: {e}")
+                    logger.error("Error when calling the function {}: {}", func.__name__, e)
                 return None
         return wrapper
     return decorator
@@ -2,17 +2,20 @@
 Глобальные зависимости проекта.
 """
 
-from typing import Annotated
+import hashlib
+from datetime import datetime
+from typing import Annotated, Optional
 
 from authx import AuthX, TokenPayload
 
-from src.config import authx_config
+from src.config import authx_config, settings
 from src.auth.models import Admin
+from src.core.ttl_cache import TTLCache
 
-from fastapi import Depends
+from fastapi import Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
+from src.database import get_async_read_session, get_async_session
 
 
 auth = AuthX(
@@ -21,6 +24,71 @@ auth = AuthX(
 )
 
 
+# Проверенные access-токены: ключ — SHA-256 токена, запись живёт не дольше
+# exp самого токена и AUTH_CACHE_TTL (за это время отзыв токена не заметен).
+token_cache: TTLCache[bytes, TokenPayload] = TTLCache(
+    maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL
+)
+_verify_access_token = auth.access_token_required
+
+
+def _expires_at(payload: TokenPayload) -> Optional[float]:
+    exp = payload.exp
+    if isinstance(exp, datetime):
+        return exp.timestamp()
+    if isinstance(exp, (int, float)):
+        return float(exp)
+    return None
+
+
+async def cached_access_token(request: Request) -> TokenPayload:
+    """
+    `auth.access_token_required` с кэшем: повторные запросы с тем же токеном
+    не декодируют и не проверяют подпись JWT заново.
+    """
+    request_token = await auth.get_access_token_from_request(request)
+    key = hashlib.sha256(request_token.token.encode()).digest()
+
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = await _verify_access_token(request)
+    token_cache.put(key, payload, expires_at=_expires_at(payload))
+    return payload
+
+
+READ_PRIMARY_COOKIE = "read_primary"
+
+
+def mark_recent_write(response: Response) -> None:
+    """
+    После записи клиент какое-то время читает с primary: реплика может
+    отставать, а админка сразу перезапрашивает список.
+    """
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        "1",
+        max_age=settings.DB_READ_YOUR_WRITES_WINDOW,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+async def get_read_session(request: Request):
+    """
+    Сессия read-only ручек. На primary остаётся, если клиент недавно писал
+    (cookie `read_primary`) или явно попросил заголовком `X-Read-Your-Writes`.
+    """
+    replica = (
+        READ_PRIMARY_COOKIE not in request.cookies
+        and "x-read-your-writes" not in request.headers
+    )
+    async for session in get_async_read_session(replica):
+        yield session
+
+
 DBSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
-AuthDep = Annotated[TokenPayload, Depends(auth.access_token_required)]
+ReadDBSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+AuthDep = Annotated[TokenPayload, Depends(cached_access_token)]
 RefreshDep = Annotated[TokenPayload, Depends(auth.refresh_token_required)]
@@ -1,17 +1,72 @@
+import asyncio
+import hmac
+from contextlib import asynccontextmanager
+
 from authx import AuthX
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, Response
 from authx.exceptions import MissingTokenError, AuthXException
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
 
 from src.auth.models import Admin
-from src.config import authx_config
+from src.config import authx_config, settings
 from src.auth import auth_router
+from src.core import background
+from src.core.captcha import captcha_client
+from src.core.log import setup_logging
+from src.core.periodic import run_periodic
+from src.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry
+from src.core.middleware import RequestGuardMiddleware
+from src.core.rate_limit import rate_limiter
+from src.core.repo_cache import repo_cache
+from src.core.sms_aero import sms_client
+from src.database import DATABASE_URL, engine, replica_engine
 from src.vote import vote_router
-
-
-app = FastAPI()
+from src.vote.export_jobs import cleanup_exports, export_worker
+from src.vote.sms_outbox import sms_outbox_worker
+from src.vote.tasks import fold_signature_counter, reconcile_signature_counter
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await captcha_client.start()
+    await sms_client.start()
+    sms_outbox_worker.start()
+    export_worker.start()
+    repo_cache.start(DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"))
+    tasks = [
+        asyncio.create_task(
+            run_periodic(
+                reconcile_signature_counter, settings.SIGNATURE_RECONCILE_INTERVAL
+            )
+        ),
+        asyncio.create_task(
+            run_periodic(fold_signature_counter, settings.SIGNATURE_FOLD_INTERVAL)
+        ),
+        asyncio.create_task(
+            run_periodic(rate_limiter.cleanup, settings.RATE_LIMIT_IP_PERIOD)
+        ),
+        asyncio.create_task(run_periodic(cleanup_exports, 3600)),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await background.drain()
+    await repo_cache.stop()
+    await export_worker.stop()
+    await sms_outbox_worker.stop()
+    await sms_client.close()
+    await captcha_client.close()
+    await logger.complete()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(auth_router)
 app.include_router(vote_router)
@@ -28,40 +83,61 @@ app.add_middleware(
     allow_headers=["*"],  # какие заголовки разрешаем
 )
 
+# Фильтр запросов, лимит по IP, заголовки безопасности и access-лог
+app.add_middleware(RequestGuardMiddleware)
+
 
 @app.get("/health", include_in_schema=False)
 async def health():
     return {"status": "ok"}
 
 
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    # Блокировка CONNECT запросов
-    if request.method == "CONNECT":
-        raise HTTPException(status_code=405, detail="Method not allowed")
+def _queue_pool(db_engine: AsyncEngine) -> QueuePool:
+    # dispose() пересоздаёт пул, поэтому он берётся при каждом чтении метрики
+    pool = db_engine.pool
+    assert isinstance(pool, QueuePool)
+    return pool
 
-    # Блокировка прокси запросов
-    if str(request.url.path).startswith("http"):
-        raise HTTPException(status_code=400, detail="Bad request")
 
-    # Блокировка подозрительных User-Agent
-    user_agent = request.headers.get("user-agent", "").lower()
-    blocked_agents = ["wget", "python", "scanner", "bot"]
-    if any(agent in user_agent for agent in blocked_agents):
-        raise HTTPException(status_code=403, detail="Forbidden")
+# size()/checkedout()/overflow() есть только у QueuePool (у NullPool — нет)
+if isinstance(engine.pool, QueuePool):
+    registry.gauge_func(
+        "db_pool_size", "SQLAlchemy pool size", lambda: _queue_pool(engine).size()
+    )
+    registry.gauge_func(
+        "db_pool_checked_out",
+        "SQLAlchemy connections checked out",
+        lambda: _queue_pool(engine).checkedout(),
+    )
+    # overflow() отрицателен, пока пул не заполнен до pool_size
+    registry.gauge_func(
+        "db_pool_overflow",
+        "SQLAlchemy overflow connections in use",
+        lambda: max(_queue_pool(engine).overflow(), 0),
+    )
 
-    response = await call_next(request)
-    return response
+if replica_engine is not None and isinstance(replica_engine.pool, QueuePool):
+    replica = replica_engine
+    registry.gauge_func(
+        "db_replica_pool_checked_out",
+        "SQLAlchemy replica connections checked out",
+        lambda: _queue_pool(replica).checkedout(),
+    )
 
 
-# Безопасные заголовки
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    return response
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    # пул, трафик по ручкам и тайминги репозиториев — не для публики
+    if not settings.METRICS_TOKEN:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    provided = request.headers.get("authorization", "").encode()
+    if not hmac.compare_digest(provided, expected):
+        return Response(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 auth = AuthX(config=authx_config, model=Admin)
@@ -79,15 +155,3 @@ async def handle_missing_token(_: Request, exc: MissingTokenError):
 @app.exception_handler(AuthXException)
 async def handle_authx(_: Request, exc: AuthXException):
     return JSONResponse({"detail": str(exc)}, status_code=status.HTTP_401_UNAUTHORIZED)
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    try:
-        client_host = request.client.host if request.client else "unknown"
-        logger.info(f"Request: {request.method} {request.url} from {client_host}")
-        response = await call_next(request)
-        return response
-    except Exception as e:
-        logger.error(f"Request failed: {e}")
-        raise
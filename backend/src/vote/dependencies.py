@@ -1,8 +1,14 @@
 from typing import Annotated
 
 from fastapi import Depends
-from src.dependencies import DBSessionDep
-from src.vote.reposiotory import SmsVerificationRepo, UserRepo, VotingRepo
+from src.dependencies import DBSessionDep, ReadDBSessionDep
+from src.vote.reposiotory import (
+    ExportJobRepo,
+    SmsOutboxRepo,
+    SmsVerificationRepo,
+    UserRepo,
+    VotingRepo,
+)
 
 
 def get_sms_repo(
@@ -11,6 +17,12 @@ def get_sms_repo(
     return SmsVerificationRepo(db_session=db_session)
 
 
+def get_sms_outbox_repo(
+    db_session: DBSessionDep,
+) -> SmsOutboxRepo:
+    return SmsOutboxRepo(db_session=db_session)
+
+
 def get_user_repo(
     db_session: DBSessionDep,
 ) -> UserRepo:
@@ -23,6 +35,29 @@ def get_voting_repo(
     return VotingRepo(db_session=db_session)
 
 
+def get_export_job_repo(
+    db_session: DBSessionDep,
+) -> ExportJobRepo:
+    return ExportJobRepo(db_session=db_session)
+
+
+def get_read_user_repo(
+    db_session: ReadDBSessionDep,
+) -> UserRepo:
+    return UserRepo(db_session=db_session)
+
+
+def get_read_voting_repo(
+    db_session: ReadDBSessionDep,
+) -> VotingRepo:
+    return VotingRepo(db_session=db_session)
+
+
 SmsRepoDep = Annotated[SmsVerificationRepo, Depends(get_sms_repo)]
+SmsOutboxRepoDep = Annotated[SmsOutboxRepo, Depends(get_sms_outbox_repo)]
 UserRepoDep = Annotated[UserRepo, Depends(get_user_repo)]
 VotingRepoDep = Annotated[VotingRepo, Depends(get_voting_repo)]
+ExportJobRepoDep = Annotated[ExportJobRepo, Depends(get_export_job_repo)]
+# read-only: чтение с реплики, если она настроена
+ReadUserRepoDep = Annotated[UserRepo, Depends(get_read_user_repo)]
+ReadVotingRepoDep = Annotated[VotingRepo, Depends(get_read_voting_repo)]
@@ -0,0 +1,187 @@
+"""
+Потоковая выгрузка подписей в CSV / XLSX.
+
+Строки читаются серверным курсором в собственной сессии (запросная сессия
+к моменту отдачи тела `StreamingResponse` может быть уже закрыта) и сразу
+пишутся построчно, поэтому память не растёт с размером таблицы.
+
+* CSV отдаётся по мере чтения, первые байты уходят сразу.
+* XLSX пишется xlsxwriter'ом в режиме `constant_memory` во временный файл
+  (формат zip не позволяет отдавать его до закрытия), затем файл отдаётся кусками.
+  Больше `XLSX_MAX_ROWS` строк не помещается на лист — продолжение идёт на
+  следующих листах, каждый со своим заголовком.
+
+`write_export` пишет то же самое сразу в файл — для фоновых выгрузок;
+он читает с primary, а не с реплики.
+"""
+
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from typing import Any, AsyncIterator, Iterable, Sequence
+
+import xlsxwriter
+from sqlalchemy import VARCHAR, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import READ_REPLICA, async_session_maker
+from src.vote.models import User
+from src.vote.reposiotory import PII_COLUMNS, UserRepo, decrypt_rows
+
+HEADER = ("ID", "Full Name", "Email", "Phone Number", "Valid Vote")
+BATCH_SIZE = 2000
+CHUNK_SIZE = 64 * 1024
+# предел строк на листе Excel, включая заголовок
+XLSX_MAX_ROWS = 1_048_576
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _format(row: Sequence[Any]) -> tuple[str, ...]:
+    obj_id, valid_vote, full_name, email, phone_number = row
+    return (
+        str(obj_id),
+        full_name or "",
+        email or "",
+        phone_number,
+        "Да" if valid_vote else "Нет",
+    )
+
+
+async def _user_rows(session: AsyncSession) -> AsyncIterator[tuple[str, ...]]:
+    """
+    Строки выгрузки. ПДн читаются шифротекстом и расшифровываются пачками
+    по `BATCH_SIZE` вне event loop.
+    """
+    rows = UserRepo(db_session=session).stream(
+        User.id,
+        User.valid_vote,
+        *(type_coerce(getattr(User, name), VARCHAR) for name in PII_COLUMNS),
+        order_by_fields=[User.created_at, User.id],
+        batch_size=BATCH_SIZE,
+    )
+    batch: list[Any] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            for decrypted in await asyncio.to_thread(decrypt_rows, batch, 2):
+                yield _format(decrypted)
+            batch = []
+    for decrypted in await asyncio.to_thread(decrypt_rows, batch, 2):
+        yield _format(decrypted)
+
+
+async def iter_user_rows() -> AsyncIterator[tuple[str, ...]]:
+    """Строки выгрузки в собственной сессии (с реплики, если она настроена)."""
+    async with async_session_maker(info={READ_REPLICA: True}) as session:
+        async for row in _user_rows(session):
+            yield row
+
+
+async def csv_chunks(rows: AsyncIterator[tuple[str, ...]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM — чтобы Excel открыл UTF-8 без мастера импорта
+    buffer.write("\ufeff")
+    writer.writerow(HEADER)
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _XlsxSheets:
+    """
+    Пишет строки в книгу, заводя новый лист, когда текущий заполнен: на
+    листе Excel не больше `XLSX_MAX_ROWS` строк, а xlsxwriter молча
+    пропускает строки за пределом (`write_row` возвращает -1).
+    """
+
+    def __init__(self, workbook: xlsxwriter.Workbook) -> None:
+        self.workbook = workbook
+        self._add_sheet()
+
+    def _add_sheet(self) -> None:
+        self.sheet = self.workbook.add_worksheet()
+        self.next_row = 0
+        self._write(HEADER)
+
+    def _write(self, row: Sequence[str]) -> None:
+        if self.sheet.write_row(self.next_row, 0, row) < 0:
+            raise RuntimeError(
+                f"xlsxwriter rejected row {self.next_row} of {self.sheet.name}"
+            )
+        self.next_row += 1
+
+    def write_rows(self, rows: Iterable[tuple[str, ...]]) -> None:
+        for row in rows:
+            if self.next_row >= XLSX_MAX_ROWS:
+                self._add_sheet()
+            self._write(row)
+
+
+async def _write_xlsx(path: str, rows: AsyncIterator[tuple[str, ...]]) -> None:
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    sheets = _XlsxSheets(workbook)
+
+    batch: list[tuple[str, ...]] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            await asyncio.to_thread(sheets.write_rows, batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(sheets.write_rows, batch)
+    await asyncio.to_thread(workbook.close)
+
+
+async def xlsx_chunks(rows: AsyncIterator[tuple[str, ...]]) -> AsyncIterator[bytes]:
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await _write_xlsx(path, rows)
+        with open(path, "rb") as file:
+            while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+async def write_export(path: str, format: str) -> tuple[int, str]:
+    """
+    Пишет выгрузку в файл `path` (для фоновых задач, см. `src.vote.export_jobs`).
+
+    Читает с primary в одном снимке (REPEATABLE READ) и в нём же считает
+    `UserRepo.dataset_fingerprint`: отпечаток, под которым файл переиспользуется,
+    точно соответствует записанным строкам.
+
+    Returns:
+        Количество строк без заголовка и отпечаток набора данных.
+    """
+    count = 0
+
+    async with async_session_maker() as session:
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        fingerprint = await UserRepo(db_session=session).dataset_fingerprint()
+
+        async def counted() -> AsyncIterator[tuple[str, ...]]:
+            nonlocal count
+            async for row in _user_rows(session):
+                count += 1
+                yield row
+
+        if format == "csv":
+            with open(path, "wb") as file:
+                async for chunk in csv_chunks(counted()):
+                    await asyncio.to_thread(file.write, chunk)
+        else:
+            await _write_xlsx(path, counted())
+    return count, fingerprint
@@ -0,0 +1,216 @@
+"""
+Фоновые выгрузки подписей в файл.
+
+Ручка только ставит задачу в `export_job` (или отдаёт готовую, если набор
+данных с тех пор не менялся), а воркер забирает задачи по одной
+(`FOR UPDATE SKIP LOCKED`, безопасно при нескольких процессах uvicorn),
+пишет файл серверным курсором в `EXPORT_DIR` и отмечает результат.
+Клиент опрашивает статус и скачивает файл с поддержкой `Range`, так что
+оборванную загрузку можно продолжить, а не строить выгрузку заново.
+"""
+
+import asyncio
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from src.config import settings
+from src.database import async_session_maker
+from src.vote.export import write_export
+from src.vote.models import ExportJob
+from src.vote.reposiotory import ExportJobRepo
+
+EXPORT_DIR = Path(settings.EXPORT_DIR)
+RETRY_DELAY = timedelta(seconds=30)
+
+
+class LeaseLost(Exception):
+    """Задачу забрала другая попытка, пока эта ещё писала файл."""
+
+
+def export_path(job: ExportJob) -> Path:
+    return EXPORT_DIR / f"{job.id}.{job.format}"
+
+
+class ExportWorker:
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def wake(self) -> None:
+        """Разбудить воркер сразу после коммита новой задачи."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with async_session_maker() as session:
+                    job = await ExportJobRepo(db_session=session).claim(
+                        lease=timedelta(seconds=settings.EXPORT_LEASE)
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("Export job claim failed: {}", exc)
+                job = None
+
+            if job is not None:
+                await self._process(job)
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.EXPORT_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _heartbeat(self, job: ExportJob) -> None:
+        """
+        Продлевает аренду, пока идёт запись. Если задачу уже забрала другая
+        попытка, поднимает `LeaseLost`.
+        """
+        lease = timedelta(seconds=settings.EXPORT_LEASE)
+        while True:
+            await asyncio.sleep(settings.EXPORT_LEASE / 3)
+            try:
+                async with async_session_maker() as session:
+                    renewed = await ExportJobRepo(db_session=session).renew(
+                        job.id, job.attempts, lease
+                    )
+                    await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # до истечения аренды есть ещё попытки продлить её
+                logger.warning("Export {} lease renewal failed: {}", job.id, exc)
+                continue
+            if not renewed:
+                raise LeaseLost(f"attempt {job.attempts} lost the lease")
+
+    async def _write(self, job: ExportJob, part: Path) -> tuple[int, str]:
+        """Пишет файл под продлением аренды; потеря аренды прерывает запись."""
+        writer = asyncio.create_task(write_export(str(part), job.format))
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await asyncio.wait((writer, heartbeat), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (writer, heartbeat):
+                task.cancel()
+            await asyncio.gather(writer, heartbeat, return_exceptions=True)
+        if writer.cancelled():
+            heartbeat.result()
+        return writer.result()
+
+    async def _process(self, job: ExportJob) -> None:
+        path = export_path(job)
+        # пишем во временный файл: готовый появляется целиком, через rename.
+        # У каждой попытки свой файл — попытка с истёкшей арендой не затрёт
+        # и не удалит файл той, что забрала задачу после неё
+        part = path.with_name(f"{path.name}.{job.attempts}.part")
+        error: Optional[str] = None
+        rows = 0
+        fingerprint = job.fingerprint
+        try:
+            if job.attempts > settings.EXPORT_MAX_ATTEMPTS:
+                # воркер падал на этой задаче, не успевая записать ошибку
+                raise RuntimeError("lease expired too many times")
+            started = time.perf_counter()
+            rows, fingerprint = await self._write(job, part)
+            logger.info(
+                "Export {} written: {} rows in {:.1f}s",
+                job.id,
+                rows,
+                time.perf_counter() - started,
+            )
+        except asyncio.CancelledError:
+            part.unlink(missing_ok=True)
+            raise
+        except Exception as exc:
+            part.unlink(missing_ok=True)
+            error = repr(exc)
+
+        try:
+            async with async_session_maker() as session:
+                repo = ExportJobRepo(db_session=session)
+                if error is None:
+                    owned = await repo.mark_done(
+                        job.id,
+                        job.attempts,
+                        rows=rows,
+                        size=part.stat().st_size,
+                        fingerprint=fingerprint,
+                    )
+                    # строка заблокирована до коммита, так что переименование
+                    # не пересечётся с новой попыткой
+                    if owned:
+                        os.replace(part, path)
+                    else:
+                        part.unlink(missing_ok=True)
+                else:
+                    retry_in = (
+                        RETRY_DELAY
+                        if job.attempts < settings.EXPORT_MAX_ATTEMPTS
+                        else None
+                    )
+                    logger.warning(
+                        "Export {} attempt {} failed: {}; {}",
+                        job.id,
+                        job.attempts,
+                        error,
+                        f"retry in {retry_in}" if retry_in else "giving up",
+                    )
+                    owned = await repo.mark_failed(
+                        job.id, job.attempts, error, retry_in
+                    )
+                await session.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # воркер живёт дальше: задача вернётся в очередь по истечении аренды
+            logger.error("Export {} result not saved: {}", job.id, exc)
+            part.unlink(missing_ok=True)
+            return
+
+        if not owned:
+            logger.warning(
+                "Export {} attempt {} lost the lease, result discarded",
+                job.id,
+                job.attempts,
+            )
+
+
+async def cleanup_exports() -> None:
+    """
+    Удаляет задачи и файлы старше `EXPORT_RETENTION`, а также осиротевшие
+    файлы (недописанные `.part` после падения процесса).
+    """
+    retention = timedelta(seconds=settings.EXPORT_RETENTION)
+    async with async_session_maker() as session:
+        expired = await ExportJobRepo(db_session=session).delete_expired(retention)
+        await session.commit()
+    for obj_id, format in expired:
+        (EXPORT_DIR / f"{obj_id}.{format}").unlink(missing_ok=True)
+
+    deadline = time.time() - settings.EXPORT_RETENTION
+    for path in EXPORT_DIR.glob("*"):
+        if path.is_file() and path.stat().st_mtime < deadline:
+            path.unlink(missing_ok=True)
+
+
+export_worker = ExportWorker()
@@ -0,0 +1,277 @@
+"""
+Массовая загрузка подписей (бумажные листы) из CSV / XLSX.
+
+Файл читается потоково пачками по `BATCH_SIZE` строк в отдельном потоке:
+нормализация телефона, проверка полей, blind index и (при `PII_ENCRYPTION`)
+шифрование ПДн. Готовые записи уходят в Postgres одним бинарным `COPY`
+(`copy_records_to_table` asyncpg) во временную таблицу, а оттуда — одним
+`INSERT ... SELECT ... ON CONFLICT DO NOTHING` в `user`. Тот же оператор
+возвращает строки, которые не вставились: номер уже есть в базе или
+повторяется в самом файле. Всё выполняется в одной транзакции.
+
+Счётчик подписей кампании учитывает только подтверждённые по СМС подписи,
+поэтому импорт его не меняет.
+"""
+
+import asyncio
+import csv
+import re
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy import text
+
+from src.config import settings
+from src.database import async_session_maker, blind_index, encrypt_many
+from src.vote.schemas import PHONE_PATTERN
+
+BATCH_SIZE = 10_000
+MAX_FIELD_LENGTH = 255
+
+STAGING_TABLE = "user_import"
+STAGING_COLUMNS = ("line", "full_name", "email", "phone_number", "phone_hash", "valid_vote")
+
+# заголовок выгрузки (src.vote.export.HEADER), имена колонок и русские варианты
+COLUMN_ALIASES = {
+    "full name": "full_name",
+    "full_name": "full_name",
+    "фио": "full_name",
+    "email": "email",
+    "phone number": "phone_number",
+    "phone_number": "phone_number",
+    "phone": "phone_number",
+    "телефон": "phone_number",
+    "valid vote": "valid_vote",
+    "valid_vote": "valid_vote",
+}
+FALSE_VALUES = frozenset(("нет", "false", "0", "no"))
+# `UserRead` требует ФИО и email: без них запись ломает выдачу пользователей
+REQUIRED_COLUMNS = ("full_name", "email", "phone_number")
+
+_PHONE_RE = re.compile(PHONE_PATTERN)
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_NON_DIGITS = re.compile(r"\D")
+
+Record = tuple[int, str, str, str, bytes, bool]
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    inserted: int = 0
+    # (номер строки файла, причина)
+    rejected: list[tuple[int, str]] = field(default_factory=list)
+    duplicates: list[tuple[int, str]] = field(default_factory=list)
+
+
+def normalize_phone(value: Any) -> Optional[str]:
+    """
+    Приводит номер к виду `+7XXXXXXXXXX` / `+373XXXXXXXX`: убирает
+    форматирование, заменяет ведущую 8 на 7, дописывает 7 к десятизначным
+    номерам. None, если номер не распознан.
+    """
+    if isinstance(value, float) and value.is_integer():
+        # числовая ячейка Excel
+        value = int(value)
+    digits = _NON_DIGITS.sub("", str(value))
+    if len(digits) == 10 and digits[0] == "9":
+        digits = "7" + digits
+    elif len(digits) == 11 and digits[0] == "8":
+        digits = "7" + digits[1:]
+    phone = "+" + digits
+    return phone if _PHONE_RE.fullmatch(phone) else None
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _columns(header: Sequence[Any]) -> dict[str, int]:
+    columns = {}
+    for idx, name in enumerate(header):
+        key = COLUMN_ALIASES.get(str(name or "").strip().lower())
+        if key is not None:
+            columns.setdefault(key, idx)
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"No {', '.join(missing)} column in header: {list(header)}")
+    return columns
+
+
+def _read_rows(path: Path) -> Iterator[tuple[int, Sequence[Any]]]:
+    """`(номер строки, значения)` без заголовка; строки нумеруются с 1, как в Excel."""
+    if path.suffix.lower() == ".xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            if sheet is None:
+                raise ValueError(f"No worksheet in {path.name}")
+            rows = sheet.iter_rows(values_only=True)
+            yield from enumerate(rows, start=1)
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            yield from enumerate(csv.reader(file), start=1)
+
+
+def _prepare(
+    rows: list[tuple[int, Sequence[Any]]],
+    columns: dict[str, int],
+    rejected: list[tuple[int, str]],
+) -> list[Record]:
+    """Проверяет и готовит пачку к COPY; отбракованные строки — в `rejected`."""
+
+    def cell(row: Sequence[Any], name: str) -> Any:
+        idx = columns.get(name)
+        return row[idx] if idx is not None and idx < len(row) else None
+
+    records = []
+    for line, row in rows:
+        if not any(value not in (None, "") for value in row):
+            continue
+        phone = normalize_phone(cell(row, "phone_number") or "")
+        if phone is None:
+            rejected.append((line, "invalid phone"))
+            continue
+        full_name = _text(cell(row, "full_name"))
+        if full_name is None:
+            rejected.append((line, "missing full name"))
+            continue
+        email = _text(cell(row, "email"))
+        if email is None:
+            rejected.append((line, "missing email"))
+            continue
+        if not _EMAIL_RE.fullmatch(email):
+            rejected.append((line, "invalid email"))
+            continue
+        if max(len(full_name), len(email)) > MAX_FIELD_LENGTH:
+            rejected.append((line, "value too long"))
+            continue
+        valid = _text(cell(row, "valid_vote"))
+        records.append(
+            (
+                line,
+                full_name,
+                email,
+                phone,
+                blind_index(phone),
+                valid is None or valid.lower() not in FALSE_VALUES,
+            )
+        )
+
+    if settings.PII_ENCRYPTION and records:
+        lines, names, emails, phones, hashes, valid = zip(*records)
+        records = list(
+            zip(
+                lines,
+                encrypt_many(names),
+                encrypt_many(emails),
+                encrypt_many(phones),
+                hashes,
+                valid,
+            )
+        )
+    return records
+
+
+async def _records(path: Path, result: ImportResult) -> AsyncIterator[Record]:
+    """Записи для COPY; чтение и подготовка пачки — в потоке, вне event loop."""
+    rows = _read_rows(path)
+    header = await asyncio.to_thread(next, rows, None)
+    if header is None:
+        return
+    columns = _columns(header[1])
+
+    def next_batch() -> Optional[list[Record]]:
+        batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+        if not batch:
+            return None
+        rejected = len(result.rejected)
+        records = _prepare(batch, columns, result.rejected)
+        # пустые строки не считаются
+        result.total += len(records) + len(result.rejected) - rejected
+        return records
+
+    # следующая пачка готовится, пока COPY отправляет текущую
+    pending = asyncio.ensure_future(asyncio.to_thread(next_batch))
+    while (records := await pending) is not None:
+        pending = asyncio.ensure_future(asyncio.to_thread(next_batch))
+        for record in records:
+            yield record
+
+
+MERGE_SQL = f"""
+WITH firsts AS (
+    SELECT DISTINCT ON (phone_hash) *
+    FROM {STAGING_TABLE}
+    ORDER BY phone_hash, line
+),
+inserted AS (
+    INSERT INTO "user" (full_name, email, phone_number, phone_hash, valid_vote)
+    SELECT full_name, email, phone_number, phone_hash, valid_vote FROM firsts
+    ON CONFLICT ON CONSTRAINT uq_user_phone DO NOTHING
+    RETURNING phone_hash
+)
+SELECT s.line, s.line = f.line AS in_database
+FROM {STAGING_TABLE} s
+JOIN firsts f USING (phone_hash)
+LEFT JOIN inserted i USING (phone_hash)
+WHERE s.line <> f.line OR i.phone_hash IS NULL
+ORDER BY s.line
+"""
+
+
+async def import_users(path: Path) -> ImportResult:
+    """
+    Загружает подписи из `path` (`.csv` или `.xlsx`, первая строка — заголовок;
+    нужны колонки ФИО, email и телефона, `valid_vote` необязательна).
+    """
+    result = ImportResult()
+    async with async_session_maker() as session:
+        conn = await session.connection()
+        await conn.execute(
+            text(
+                f"CREATE TEMP TABLE {STAGING_TABLE} ("
+                "line integer, full_name varchar, email varchar, "
+                "phone_number varchar, phone_hash bytea, valid_vote boolean"
+                ") ON COMMIT DROP"
+            )
+        )
+        driver = (await conn.get_raw_connection()).driver_connection
+        if driver is None:
+            raise RuntimeError("Import needs an open asyncpg connection")
+        started = time.perf_counter()
+        await driver.copy_records_to_table(
+            STAGING_TABLE, records=_records(path, result), columns=STAGING_COLUMNS
+        )
+        logger.info(
+            "Import: {} rows staged in {:.1f}s", result.total, time.perf_counter() - started
+        )
+
+        started = time.perf_counter()
+        # временные таблицы autovacuum не анализирует — без статистики
+        # планировщик считает staging крошечной
+        await conn.execute(text(f"ANALYZE {STAGING_TABLE}"))
+        # DISTINCT ON и хеш-соединения по миллионам строк — без сброса на диск
+        await conn.execute(text("SET LOCAL work_mem = '256MB'"))
+        skipped = (await conn.execute(text(MERGE_SQL))).all()
+        await session.commit()
+        logger.info("Import: merged in {:.1f}s", time.perf_counter() - started)
+
+    staged = result.total - len(result.rejected)
+    result.duplicates = [
+        (line, "already exists" if in_database else "duplicate in file")
+        for line, in_database in skipped
+    ]
+    result.inserted = staged - len(result.duplicates)
+    return result
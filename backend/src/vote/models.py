@@ -5,17 +5,21 @@ from uuid import UUID
 
 from sqlalchemy import (
     VARCHAR,
+    BigInteger,
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    PrimaryKeyConstraint,
     UniqueConstraint,
+    func,
     text,
 )
-from sqlalchemy.dialects.postgresql import CITEXT, ENUM, UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import BYTEA, ENUM, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.database import Base
+from src.database import Base, PhoneNumber, PiiString, blind_index
 
 
 def uuid_pk() -> Mapped[UUID]:
@@ -32,26 +36,63 @@ def tz_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _phone_hash_default(context) -> bytes:
+    return blind_index(context.get_current_parameters()["phone_number"])
+
+
 class User(Base):
-    """Пользователь, фиксируем телефон как уникальный."""
+    """
+    Пользователь, фиксируем телефон как уникальный.
+
+    ФИО, email и телефон хранятся через `PiiString` (шифруются при
+    `PII_ENCRYPTION`) и загружаются отложенно: обычные запросы их не читают
+    и не расшифровывают, нужные места подгружают их явно пачкой
+    (`UserRepo.load_pii`). Поиск и уникальность по телефону — по blind index
+    `phone_hash`, который заполняется автоматически при INSERT.
+    """
 
     id: Mapped[UUID] = uuid_pk()
 
-    full_name: Mapped[Optional[str]] = mapped_column(VARCHAR(255))
+    full_name: Mapped[Optional[str]] = mapped_column(
+        PiiString(1024), deferred=True, deferred_raiseload=True
+    )
 
     email: Mapped[Optional[str]] = mapped_column(
-        CITEXT(),
+        PiiString(1024),
         nullable=True,
+        deferred=True,
+        deferred_raiseload=True,
     )
 
     phone_number: Mapped[str] = mapped_column(
-        VARCHAR(20),
+        PiiString(255),
         nullable=False,
+        deferred=True,
+        deferred_raiseload=True,
+    )
+    phone_hash: Mapped[bytes] = mapped_column(
+        BYTEA, nullable=False, default=_phone_hash_default
     )
 
     valid_vote: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
-    __table_args__ = (UniqueConstraint("phone_number", name="uq_user_phone"),)
+    __table_args__ = (
+        UniqueConstraint("phone_hash", name="uq_user_phone"),
+        # keyset-пагинация админской таблицы: ORDER BY created_at DESC, id DESC
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index(
+            "ix_user_valid_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("valid_vote"),
+        ),
+        # поиск по префиксу телефона (LIKE '+7999%'), только без PII_ENCRYPTION
+        Index(
+            "ix_user_phone_number_pattern",
+            "phone_number",
+            postgresql_ops={"phone_number": "varchar_pattern_ops"},
+        ),
+    )
 
     sms_verifications: Mapped[List["SmsVerification"]] = relationship(
         back_populates="user",
@@ -60,15 +101,18 @@ class User(Base):
     )
 
     def __repr__(self) -> str:
-        return f"<User {self.id} {self.phone_number}>"
+        return f"<User {self.id}>"
 
 
 class SmsVerification(Base):
-    """Одноразовый код подтверждения, может быть несколько записей на одного User."""
+    """
+    Одноразовый код подтверждения. Одна запись на номер: переотправка
+    обновляет её (`INSERT ... ON CONFLICT (phone_number)`).
+    """
 
     id: Mapped[UUID] = uuid_pk()
 
-    phone_number: Mapped[str] = mapped_column(VARCHAR(20), nullable=False)
+    phone_number: Mapped[str] = mapped_column(PhoneNumber, nullable=False)
     code: Mapped[str] = mapped_column(VARCHAR(6), nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(
@@ -90,6 +134,10 @@ class SmsVerification(Base):
     )
     user: Mapped["User"] = relationship(back_populates="sms_verifications")
 
+    __table_args__ = (
+        Index("uq_sms_verification_phone_number", "phone_number", unique=True),
+    )
+
     def __repr__(self) -> str:
         return f"<SMS {self.phone_number} verified={self.is_verified}>"
 
@@ -123,3 +171,120 @@ class Voting(Base):
 
     def __repr__(self) -> str:
         return f"<Voting {self.id} {self.status}>"
+
+
+class VotingCounterShard(Base):
+    """
+    Слот шардированного счётчика подписей кампании.
+
+    Инкремент пишет в случайный слот, чтобы параллельные подтверждения не
+    упирались в блокировку единственной строки `voting`. Итог = значение в
+    `Voting` + сумма по слотам; фоновая задача периодически сворачивает слоты
+    обратно в `Voting`.
+    """
+
+    voting_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("voting.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    shard: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    real_delta: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fake_delta: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (PrimaryKeyConstraint("voting_id", "shard"),)
+
+    def __repr__(self) -> str:
+        return f"<VotingCounterShard {self.voting_id}#{self.shard}>"
+
+
+class SmsOutboxStatus(str, enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
+
+class SmsOutbox(Base):
+    """
+    Исходящее СМС. Пишется в одной транзакции с `SmsVerification`,
+    отправляется фоновым воркером (`src.vote.sms_outbox`).
+    """
+
+    id: Mapped[UUID] = uuid_pk()
+
+    phone_number: Mapped[str] = mapped_column(PhoneNumber, nullable=False)
+    body: Mapped[str] = mapped_column(VARCHAR(255), nullable=False)
+
+    status: Mapped[SmsOutboxStatus] = mapped_column(
+        ENUM(SmsOutboxStatus, name="sms_outbox_status", create_type=True),
+        nullable=False,
+        default=SmsOutboxStatus.pending,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[Optional[str]] = mapped_column(VARCHAR(255))
+
+    __table_args__ = (
+        Index(
+            "ix_sms_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SmsOutbox {self.id} {self.status}>"
+
+
+class ExportStatus(str, enum.Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class ExportJob(Base):
+    """
+    Задача выгрузки подписей в файл; выполняется фоновым воркером
+    (`src.vote.export_jobs`), файл лежит в `EXPORT_DIR` под именем `<id>.<format>`.
+
+    `fingerprint` — версия набора данных: при постановке — текущая, после
+    выполнения — того снимка, из которого собран файл. Пока таблица `user`
+    не менялась, новая выгрузка того же формата отдаёт готовый файл.
+    """
+
+    id: Mapped[UUID] = uuid_pk()
+
+    format: Mapped[str] = mapped_column(VARCHAR(8), nullable=False)
+    fingerprint: Mapped[str] = mapped_column(VARCHAR(64), nullable=False)
+
+    status: Mapped[ExportStatus] = mapped_column(
+        ENUM(ExportStatus, name="export_status", create_type=True),
+        nullable=False,
+        default=ExportStatus.pending,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # для pending — когда можно брать, для running — конец аренды воркера
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    rows: Mapped[Optional[int]] = mapped_column(Integer)
+    size: Mapped[Optional[int]] = mapped_column(BigInteger)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[Optional[str]] = mapped_column(VARCHAR(255))
+
+    __table_args__ = (
+        Index("ix_export_job_fingerprint", "fingerprint", "format"),
+        Index(
+            "ix_export_job_queue",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ExportJob {self.id} {self.format} {self.status}>"
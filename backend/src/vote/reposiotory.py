@@ -1,14 +1,54 @@
+import asyncio
+import hashlib
+import random
+import re
+from itertools import batched
 from secrets import randbelow
 from datetime import datetime, timedelta, timezone
-from typing import Sequence
-from uuid import UUID
+from typing import Any, Mapping, Optional, Sequence
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, true, update
+from sqlalchemy import (
+    VARCHAR,
+    ColumnElement,
+    Integer,
+    ScalarSelect,
+    Select,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    select,
+    true,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
+from sqlalchemy.sql.dml import ReturningInsert
+from sqlalchemy.orm.attributes import set_committed_value
 
+from src.config import settings
 from src.core.generic_crud_repo import GenericCRUDRepository
+from src.database import blind_index, decrypt_many
 
-from src.vote.models import SmsVerification, User, Voting
+from src.vote.models import (
+    ExportJob,
+    ExportStatus,
+    SmsOutbox,
+    SmsOutboxStatus,
+    SmsVerification,
+    User,
+    Voting,
+    VotingCounterShard,
+)
 from src.vote.schemas import (
+    PHONE_PATTERN,
+    ExportJobCreate,
+    ExportJobRead,
+    SmsOutboxCreate,
+    SmsOutboxUpdate,
     SmsVerificationCreate,
     SmsVerificationUpdate,
     UserCreate,
@@ -17,25 +57,344 @@ from src.vote.schemas import (
     VotingUpdate,
 )
 
+from fastapi import HTTPException, status
 from loguru import logger
 
 
+PII_COLUMNS = ("full_name", "email", "phone_number")
+PII_BATCH_SIZE = 10_000
+
+_PHONE_RE = re.compile(PHONE_PATTERN)
+
+
+def decrypt_rows(rows: Sequence[Sequence[Any]], skip: int = 1) -> list[tuple[Any, ...]]:
+    """Расшифровывает колонки строк, кроме первых `skip` (ключей и прочего)."""
+    if not rows:
+        return []
+    columns = list(zip(*rows))
+    decrypted = [decrypt_many(column) for column in columns[skip:]]
+    return list(zip(*columns[:skip], *decrypted))
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """`created_at` хранится как TIMESTAMP без зоны (UTC)."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class UserRepo(GenericCRUDRepository[User, UserCreate, UserUpdate]):
     model = User
     create_schema = UserCreate
     update_schema = UserUpdate
 
+    async def _apply_filters(
+        self, stmt: Select[tuple[User]], filters: Optional[Mapping[str, Any]]
+    ) -> Select[tuple[User]]:
+        """
+        Фильтры админской таблицы (см. `UserFilter`): `valid_vote`,
+        диапазон `created_at` [created_from, created_to) и префикс телефона.
+
+        Raises:
+            HTTPException(400): неполный `phone_prefix` при `PII_ENCRYPTION`.
+        """
+        if not filters:
+            return stmt
+
+        if filters.get("valid_vote") is not None:
+            stmt = stmt.where(User.valid_vote.is_(filters["valid_vote"]))
+        if filters.get("created_from") is not None:
+            stmt = stmt.where(User.created_at >= _naive_utc(filters["created_from"]))
+        if filters.get("created_to") is not None:
+            stmt = stmt.where(User.created_at < _naive_utc(filters["created_to"]))
+        if filters.get("phone_prefix"):
+            prefix = filters["phone_prefix"]
+            if settings.PII_ENCRYPTION:
+                # по шифротексту префикс не найти. Полный номер не бывает
+                # префиксом другого, так что для него поиск по blind index
+                # равносилен поиску по префиксу; короче — честный отказ
+                if not _PHONE_RE.fullmatch(prefix):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="phone_prefix must be a full phone number "
+                        "when PII encryption is enabled",
+                    )
+                stmt = stmt.where(User.phone_hash == blind_index(prefix))
+            else:
+                stmt = stmt.where(User.phone_number.startswith(prefix, autoescape=True))
+        return stmt
+
+    async def get_by_phone(self, phone: str) -> Optional[User]:
+        """Поиск по blind index, без чтения и расшифровки ПДн."""
+        return await self.db_session.scalar(
+            select(User).where(User.phone_hash == blind_index(phone))
+        )
+
+    async def load_pii(self, users: Sequence[User]) -> None:
+        """
+        Подгружает отложенные ПДн (`PII_COLUMNS`) для уже загруженных
+        пользователей: шифротекст читается одним запросом на пачку,
+        расшифровывается пачкой вне event loop.
+        """
+        by_id = {user.id: user for user in users}
+        raw = [type_coerce(getattr(User, name), VARCHAR) for name in PII_COLUMNS]
+        for ids in batched(by_id, PII_BATCH_SIZE):
+            result = await self.db_session.execute(
+                select(User.id, *raw).where(User.id.in_(ids))
+            )
+            decrypted = await asyncio.to_thread(decrypt_rows, result.all())
+            for obj_id, *values in decrypted:
+                for name, value in zip(PII_COLUMNS, values):
+                    set_committed_value(by_id[obj_id], name, value)
+
+    async def dataset_fingerprint(self) -> str:
+        """
+        Версия содержимого таблицы в снимке текущей транзакции: число строк
+        и сумма хешей `(xmin, ctid)`. Любая вставка, правка или удаление
+        меняет версию строки, поэтому отпечаток меняется, даже если изменение
+        закоммичено позже, чем началась транзакция с `now()` в `updated_at`.
+        """
+        version = func.hashtext(
+            func.concat(
+                literal_column('"user".xmin::text'), ":", literal_column('"user".ctid::text')
+            )
+        )
+        count, versions = (
+            await self.db_session.execute(
+                select(func.count(), func.coalesce(func.sum(version), 0)).select_from(User)
+            )
+        ).one()
+        return hashlib.sha256(f"{count}|{versions}".encode()).hexdigest()
+
     async def get_all_valid(self) -> Sequence[User]:
         stmt = select(self.model).where(User.valid_vote.is_(true()))
         result = await self.db_session.execute(stmt)
         return result.scalars().all()
 
+    async def set_valid_vote(self, obj_id: UUID, valid_vote: bool) -> Optional[bool]:
+        """
+        Меняет признак валидности подписи без коммита.
+
+        Returns:
+            None  – запись не найдена или значение не изменилось;
+            True  – значение изменилось у подтверждённой (учтённой в счётчике) подписи;
+            False – значение изменилось, но подпись ещё не подтверждена по СМС.
+        """
+        is_signed = exists().where(
+            SmsVerification.user_id == User.id,
+            SmsVerification.is_verified.is_(true()),
+        )
+        stmt = (
+            update(User)
+            .where(User.id == obj_id, User.valid_vote.is_distinct_from(valid_vote))
+            .values(valid_vote=valid_vote, updated_at=func.now())
+            .returning(is_signed)
+        )
+        return await self.db_session.scalar(stmt)
+
 
 class VotingRepo(GenericCRUDRepository[Voting, VotingCreate, VotingUpdate]):
+    """
+    Счётчики подписей кампании.
+
+    `real_quantity` / `fake_quantity` = значение в строке `voting` + сумма
+    дельт в `VotingCounterShard`. Инкременты пишутся в случайный слот
+    (без общей блокировки строки `voting`), `fold_counter_shards` периодически
+    переносит дельты в `voting`, `reconcile_real_quantity` сверяет счётчик
+    с таблицей `user`.
+    """
+
     model = Voting
     create_schema = VotingCreate
     update_schema = VotingUpdate
 
+    COUNTER_SHARDS = settings.SIGNATURE_COUNTER_SHARDS
+
+    @staticmethod
+    def current_id() -> ScalarSelect[UUID]:
+        """Подзапрос id текущей (самой ранней) кампании."""
+        return (
+            select(Voting.id)
+            .order_by(Voting.created_at, Voting.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    async def get_current_with_counts(
+        self,
+    ) -> Optional[tuple[Voting, int, int, datetime]]:
+        """
+        Кампания вместе с актуальными счётчиками (с учётом несвёрнутых слотов).
+
+        Returns:
+            `(voting, real_quantity, fake_quantity, changed_at)` или None, если
+            кампании нет. `changed_at` — последнее изменение строки `voting`
+            или любого её слота счётчика.
+        """
+        shards = (
+            select(
+                func.coalesce(func.sum(VotingCounterShard.real_delta), 0).label("real"),
+                func.coalesce(func.sum(VotingCounterShard.fake_delta), 0).label("fake"),
+                func.max(VotingCounterShard.updated_at).label("changed_at"),
+            )
+            .where(VotingCounterShard.voting_id == Voting.id)
+            .lateral()
+        )
+        stmt = (
+            select(
+                Voting,
+                Voting.real_quantity + shards.c.real,
+                Voting.fake_quantity + shards.c.fake,
+                # greatest() в Postgres пропускает NULL, когда слотов нет
+                func.greatest(Voting.updated_at, shards.c.changed_at),
+            )
+            .join(shards, true())
+            .where(Voting.id == self.current_id())
+        )
+        row = (await self.db_session.execute(stmt)).first()
+        if row is None:
+            return None
+        voting, real, fake, changed_at = row
+        return voting, real, fake, changed_at
+
+    @classmethod
+    def increment_statement(
+        cls,
+        *,
+        real: int | ColumnElement[int] | ColumnElement[bool],
+        fake: int,
+        voting_id: Optional[UUID] = None,
+        when: Optional[ColumnElement[bool]] = None,
+    ) -> Insert:
+        """
+        INSERT дельт в случайный слот счётчика кампании `voting_id` (по
+        умолчанию текущей); логическое `real` считается как 0/1, `when` —
+        дополнительное условие, при ложном ничего не вставляется.
+        """
+        source = select(
+            Voting.id,
+            literal(random.randrange(cls.COUNTER_SHARDS)),
+            cast(real, Integer),
+            literal(fake),
+        )
+        source = source.where(
+            Voting.id == (voting_id if voting_id is not None else cls.current_id())
+        )
+        if when is not None:
+            source = source.where(when)
+
+        stmt = pg_insert(VotingCounterShard).from_select(
+            ["voting_id", "shard", "real_delta", "fake_delta"], source
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=["voting_id", "shard"],
+            set_={
+                "real_delta": VotingCounterShard.real_delta + stmt.excluded.real_delta,
+                "fake_delta": VotingCounterShard.fake_delta + stmt.excluded.fake_delta,
+                "updated_at": func.now(),
+            },
+        )
+
+    async def _increment(
+        self,
+        *,
+        real: int | ColumnElement[int],
+        fake: int,
+        voting_id: Optional[UUID] = None,
+    ) -> None:
+        """
+        Добавляет дельты в случайный слот счётчика кампании (по умолчанию текущей). Без коммита.
+        """
+        await self.db_session.execute(
+            self.increment_statement(real=real, fake=fake, voting_id=voting_id)
+        )
+
+    async def add_real_quantity(self, delta: int) -> None:
+        """Сдвигает счётчик реальных подписей на `delta`. Без коммита."""
+        await self._increment(real=delta, fake=0)
+
+    async def fold_counter_shards(self) -> int:
+        """
+        Переносит дельты из слотов в строку `voting` одним statement'ом. Без коммита.
+
+        Returns:
+            Количество обновлённых кампаний.
+        """
+        folded = (
+            delete(VotingCounterShard)
+            .returning(
+                VotingCounterShard.voting_id,
+                VotingCounterShard.real_delta,
+                VotingCounterShard.fake_delta,
+            )
+            .cte("folded")
+        )
+        sums = (
+            select(
+                folded.c.voting_id,
+                func.sum(folded.c.real_delta).label("real"),
+                func.sum(folded.c.fake_delta).label("fake"),
+            )
+            .group_by(folded.c.voting_id)
+            .subquery("sums")
+        )
+        stmt = (
+            update(Voting)
+            .where(Voting.id == sums.c.voting_id)
+            .values(
+                real_quantity=Voting.real_quantity + sums.c.real,
+                fake_quantity=Voting.fake_quantity + sums.c.fake,
+            )
+        )
+        result = await self._execute_dml(stmt)
+        if result.rowcount:
+            await self._invalidate_cache()
+        return result.rowcount
+
+    async def reconcile_real_quantity(self) -> int:
+        """
+        Пересчитывает `real_quantity` текущей кампании по таблице `user`
+        (валидные пользователи с подтверждённым кодом) с учётом несвёрнутых
+        слотов. Без коммита.
+
+        Returns:
+            Актуальное количество подписей.
+        """
+        signed = (
+            select(func.count())
+            .select_from(User)
+            .where(
+                User.valid_vote.is_(true()),
+                exists().where(
+                    SmsVerification.user_id == User.id,
+                    SmsVerification.is_verified.is_(true()),
+                ),
+            )
+            .scalar_subquery()
+        )
+        pending = (
+            select(func.coalesce(func.sum(VotingCounterShard.real_delta), 0))
+            .where(VotingCounterShard.voting_id == Voting.id)
+            .scalar_subquery()
+        )
+        real_quantity = signed - pending
+        result = await self.db_session.execute(
+            update(Voting)
+            # сошедшийся счётчик не переписывается: ни новой версии строки,
+            # ни сброса кэша
+            .where(
+                Voting.id == self.current_id(),
+                Voting.real_quantity.is_distinct_from(real_quantity),
+            )
+            .values(real_quantity=real_quantity)
+            .returning(Voting.real_quantity + pending)
+        )
+        total = result.scalars().first()
+        if total is None:
+            return (await self.db_session.execute(select(signed))).scalar_one()
+        await self._invalidate_cache()
+        return total
+
 
 class SmsVerificationRepo(
     GenericCRUDRepository[SmsVerification, SmsVerificationCreate, SmsVerificationUpdate]
@@ -50,76 +409,365 @@ class SmsVerificationRepo(
     def _gen_code(self) -> str:
         return f"{randbelow(1_000_000):06d}"
 
-    async def create_or_resend(self, phone: str, user_id: UUID) -> str | None:
+    def _upsert_code(
+        self, phone: str, code: str, user_id: Any
+    ) -> ReturningInsert[tuple[UUID]]:
+        """
+        INSERT новой записи или переотправка: код, срок и счётчик попыток
+        перезаписываются, только если номер ещё не подтверждён. Для
+        подтверждённого номера RETURNING пуст.
+        """
         now = datetime.now(timezone.utc)
-        logger.info(f"create_or_resend start: phone={phone}, user_id={user_id}")
-        try:
-            logger.debug("Selecting existing verification")
-            verif = await self.db_session.scalar(
-                select(SmsVerification).where(SmsVerification.phone_number == phone)
-            )
-            logger.debug(f"Selected verif: {verif!r}")
-
-            if verif and verif.is_verified:
-                logger.info("Already verified, returning None")
-                return None
-
-            code = self._gen_code()
-            expires = now + self.CODE_TTL
-            logger.debug(f"Generated code={code}, expires={expires}")
-
-            if verif:
-                logger.debug("Updating existing SmsVerification")
-                res = await self.db_session.execute(
-                    update(SmsVerification)
-                    .where(SmsVerification.id == verif.id)
-                    .values(
-                        code=code, expires_at=expires, attempts=0, is_verified=False
-                    )
-                )
-                logger.debug(f"Update result: {res.rowcount} rows")
-            else:
-                logger.debug("Creating new SmsVerification")
-                sms = SmsVerification(
-                    phone_number=phone,
-                    code=code,
-                    expires_at=expires,
-                    user_id=user_id,
-                )
-                self.db_session.add(sms)
-                logger.debug(f"Added new entity: {sms!r}")
-
-            logger.info("create_or_resend complete")
-            return code
-
-        except Exception as exc:
-            logger.error(f"Error in create_or_resend: {exc!r}", exc_info=True)
-            raise
+        stmt = pg_insert(SmsVerification).values(
+            id=uuid4(),
+            phone_number=phone,
+            code=code,
+            expires_at=now + self.CODE_TTL,
+            attempts=0,
+            is_verified=False,
+            user_id=user_id,
+            created_at=now,
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[SmsVerification.phone_number],
+            set_={
+                "code": stmt.excluded.code,
+                "expires_at": stmt.excluded.expires_at,
+                "attempts": 0,
+                "updated_at": func.now(),
+            },
+            where=SmsVerification.is_verified.is_(False),
+        ).returning(SmsVerification.id)
+
+    async def create_or_resend(self, phone: str, user_id: UUID) -> str | None:
+        """
+        Выдаёт новый код для номера одним оператором. Без коммита.
+
+        Returns:
+            Код или None, если номер уже подтверждён.
+        """
+        code = self._gen_code()
+        issued = await self.db_session.scalar(self._upsert_code(phone, code, user_id))
+        logger.debug("create_or_resend: phone={}, issued={}", phone, issued is not None)
+        return code if issued is not None else None
+
+    def new_code(self) -> str:
+        return self._gen_code()
+
+    async def intake(self, data: UserCreate, code: str, sms_body: str) -> bool:
+        """
+        Приём подписи одним запросом к БД: upsert пользователя по
+        `uq_user_phone`, новый код в `sms_verification` (см. `_upsert_code`)
+        и СМС в outbox.
+
+        Выполняется в autocommit: один оператор атомарен сам по себе, поэтому
+        BEGIN/COMMIT не нужны. Должен быть первым обращением к БД в сессии.
+
+        Returns:
+            False — номер уже подтверждён, код не выдан.
+        """
+        phone = data.phone_number
+
+        user = (
+            pg_insert(User)
+            .values(
+                id=uuid4(),
+                full_name=data.full_name,
+                email=data.email,
+                phone_number=phone,
+                phone_hash=blind_index(phone),
+                valid_vote=True,
+            )
+            .on_conflict_do_update(
+                constraint="uq_user_phone", set_={"updated_at": func.now()}
+            )
+            .returning(User.id)
+            .cte("intake_user")
+        )
+        issued = self._upsert_code(
+            phone, code, select(user.c.id).scalar_subquery()
+        ).cte("intake_code")
+        queued = (
+            pg_insert(SmsOutbox)
+            .from_select(
+                ["id", "phone_number", "body", "status", "attempts"],
+                select(
+                    func.gen_random_uuid(),
+                    literal(phone, SmsOutbox.phone_number.type),
+                    literal(sms_body, VARCHAR),
+                    literal(SmsOutboxStatus.pending, SmsOutbox.status.type),
+                    literal(0),
+                ).select_from(issued),
+            )
+            .returning(SmsOutbox.id)
+            .cte("intake_outbox")
+        )
+
+        await self.db_session.connection(
+            execution_options={"isolation_level": "AUTOCOMMIT"}
+        )
+        return bool(await self.db_session.scalar(select(exists(select(queued.c.id)))))
 
     async def verify_code(self, phone: str, code: str) -> bool:
         """
-        Возвращает True — код принят;
-                   False — неверный / истёк / превышен лимит.
+        Проверка кода и учёт подписи одним оператором в autocommit.
+
+        Попытка засчитывается условным UPDATE, поэтому параллельные попытки
+        не могут превысить `MAX_ATTEMPTS`, а код принимается ровно один раз.
+        При успехе в том же операторе подпись попадает в счётчик кампании:
+        `fake_quantity` растёт всегда, `real_quantity` — если подпись не
+        отклонена админом. Должен быть первым обращением к БД в сессии.
+
+        Returns:
+            True — код принят; False — неверный / истёк / превышен лимит.
         """
-        now = datetime.now(timezone.utc)
+        attempt = (
+            update(SmsVerification)
+            .where(
+                SmsVerification.phone_number == phone,
+                SmsVerification.is_verified.is_(False),
+                SmsVerification.expires_at > func.now(),
+                SmsVerification.attempts < self.MAX_ATTEMPTS,
+            )
+            .values(
+                attempts=SmsVerification.attempts + 1,
+                is_verified=SmsVerification.code == code,
+            )
+            .returning(SmsVerification.is_verified, SmsVerification.user_id)
+            .cte("attempt")
+        )
+        accepted = select(attempt.c.user_id).where(attempt.c.is_verified)
+        signed = (
+            VotingRepo.increment_statement(
+                real=exists(
+                    select(User.id).where(
+                        User.id.in_(accepted), User.valid_vote.is_(true())
+                    )
+                ),
+                fake=1,
+                when=exists(accepted),
+            )
+            .returning(VotingCounterShard.voting_id)
+            .cte("signed")
+        )
+        stmt = select(
+            attempt.c.is_verified,
+            select(func.count()).select_from(signed).scalar_subquery(),
+        )
+
+        await self.db_session.connection(
+            execution_options={"isolation_level": "AUTOCOMMIT"}
+        )
+        row = (await self.db_session.execute(stmt)).first()
+        return bool(row and row.is_verified)
+
+
+class SmsOutboxRepo(GenericCRUDRepository[SmsOutbox, SmsOutboxCreate, SmsOutboxUpdate]):
+    model = SmsOutbox
+    create_schema = SmsOutboxCreate
+    update_schema = SmsOutboxUpdate
+
+    async def enqueue(self, phone: str, body: str) -> None:
+        """Ставит СМС в очередь. Без коммита — уходит вместе с транзакцией вызова."""
+        self.db_session.add(SmsOutbox(phone_number=phone, body=body))
+
+    async def claim_batch(self, limit: int, lease: timedelta) -> Sequence[SmsOutbox]:
+        """
+        Забирает до `limit` готовых к отправке сообщений (`FOR UPDATE SKIP LOCKED`)
+        и сдвигает им `next_attempt_at` на `lease`: если воркер упадёт, сообщение
+        снова станет доступным после истечения аренды. Коммитит сразу, чтобы
+        не держать блокировки во время отправки.
+        """
+        due = (
+            select(SmsOutbox.id)
+            .where(
+                SmsOutbox.status == SmsOutboxStatus.pending,
+                SmsOutbox.next_attempt_at <= func.now(),
+            )
+            .order_by(SmsOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(SmsOutbox)
+            .where(SmsOutbox.id.in_(due))
+            .values(
+                attempts=SmsOutbox.attempts + 1,
+                next_attempt_at=func.now() + lease,
+            )
+            .returning(SmsOutbox)
+        )
+        result = await self.db_session.execute(stmt)
+        claimed = result.scalars().all()
+        await self.db_session.commit()
+        return claimed
+
+    async def mark_sent(self, obj_ids: Sequence[UUID]) -> None:
+        """Отмечает отправленными. Без коммита."""
+        if not obj_ids:
+            return
+        await self.db_session.execute(
+            update(SmsOutbox)
+            .where(SmsOutbox.id.in_(obj_ids))
+            .values(status=SmsOutboxStatus.sent, sent_at=func.now(), last_error=None)
+        )
+
+    async def mark_failed(
+        self, obj_id: UUID, error: str, retry_in: Optional[timedelta]
+    ) -> None:
+        """
+        Фиксирует ошибку: перепланирует через `retry_in` или, если None, сдаётся.
+        Без коммита.
+        """
+        values: dict = {"last_error": error[:255]}
+        if retry_in is None:
+            values["status"] = SmsOutboxStatus.failed
+        else:
+            values["next_attempt_at"] = func.now() + retry_in
+        await self.db_session.execute(
+            update(SmsOutbox).where(SmsOutbox.id == obj_id).values(**values)
+        )
+
+
+class ExportJobRepo(GenericCRUDRepository[ExportJob, ExportJobCreate, ExportJobRead]):
+    model = ExportJob
+    create_schema = ExportJobCreate
+    update_schema = ExportJobRead
+
+    async def find_reusable(self, format: str, fingerprint: str) -> Optional[ExportJob]:
+        """Последняя поставленная или готовая выгрузка того же набора данных."""
+        stmt = (
+            select(ExportJob)
+            .where(
+                ExportJob.format == format,
+                ExportJob.fingerprint == fingerprint,
+                ExportJob.status != ExportStatus.failed,
+            )
+            .order_by(ExportJob.created_at.desc())
+            .limit(1)
+        )
+        return await self.db_session.scalar(stmt)
+
+    async def claim(self, lease: timedelta) -> Optional[ExportJob]:
+        """
+        Забирает одну задачу (`FOR UPDATE SKIP LOCKED`): ожидающую или
+        `running` с истёкшей арендой — её воркер, видимо, упал. Коммитит сразу.
+        """
+        due = (
+            select(ExportJob.id)
+            .where(
+                ExportJob.status.in_((ExportStatus.pending, ExportStatus.running)),
+                ExportJob.next_attempt_at <= func.now(),
+            )
+            .order_by(ExportJob.next_attempt_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(ExportJob)
+            .where(ExportJob.id.in_(due))
+            .values(
+                status=ExportStatus.running,
+                attempts=ExportJob.attempts + 1,
+                next_attempt_at=func.now() + lease,
+            )
+            .returning(ExportJob)
+        )
+        job = (await self.db_session.execute(stmt)).scalar_one_or_none()
+        await self.db_session.commit()
+        return job
 
-        async with self.db_session.begin():
-            verif = await self.db_session.scalar(
-                select(SmsVerification).where(SmsVerification.phone_number == phone)
+    @staticmethod
+    def _owned(obj_id: UUID, attempts: int) -> tuple[ColumnElement[bool], ...]:
+        """
+        Задача всё ещё за попыткой `attempts`: после истечения аренды её
+        забирает другой воркер, и счётчик попыток растёт.
+        """
+        return (
+            ExportJob.id == obj_id,
+            ExportJob.attempts == attempts,
+            ExportJob.status == ExportStatus.running,
+        )
+
+    async def renew(self, obj_id: UUID, attempts: int, lease: timedelta) -> bool:
+        """
+        Продлевает аренду выполняющейся задачи. Без коммита.
+
+        Returns:
+            False — аренду уже забрала другая попытка.
+        """
+        result = await self.db_session.execute(
+            update(ExportJob)
+            .where(*self._owned(obj_id, attempts))
+            .values(next_attempt_at=func.now() + lease)
+            .returning(ExportJob.id)
+        )
+        return result.first() is not None
+
+    async def mark_done(
+        self, obj_id: UUID, attempts: int, rows: int, size: int, fingerprint: str
+    ) -> bool:
+        """
+        Отмечает выгрузку готовой. `fingerprint` — отпечаток данных, из которых
+        файл построен на самом деле (при постановке задачи он мог быть другим).
+        Без коммита: до коммита строка заблокирована, и `claim` её пропускает.
+
+        Returns:
+            False — аренду уже забрала другая попытка, статус не изменён.
+        """
+        result = await self.db_session.execute(
+            update(ExportJob)
+            .where(*self._owned(obj_id, attempts))
+            .values(
+                status=ExportStatus.done,
+                fingerprint=fingerprint,
+                rows=rows,
+                size=size,
+                finished_at=func.now(),
+                last_error=None,
             )
-            if not verif:
-                return False
+            .returning(ExportJob.id)
+        )
+        return result.first() is not None
 
-            if verif.is_verified or verif.expires_at < now:
-                return False
+    async def mark_failed(
+        self, obj_id: UUID, attempts: int, error: str, retry_in: Optional[timedelta]
+    ) -> bool:
+        """
+        Фиксирует ошибку: возвращает задачу в очередь через `retry_in` или,
+        если None, сдаётся. Без коммита.
 
-            if verif.attempts >= self.MAX_ATTEMPTS:
-                return False
+        Returns:
+            False — аренду уже забрала другая попытка, статус не изменён.
+        """
+        values: dict = {"last_error": error[:255]}
+        if retry_in is None:
+            values.update(status=ExportStatus.failed, finished_at=func.now())
+        else:
+            values.update(
+                status=ExportStatus.pending, next_attempt_at=func.now() + retry_in
+            )
+        result = await self.db_session.execute(
+            update(ExportJob)
+            .where(*self._owned(obj_id, attempts))
+            .values(**values)
+            .returning(ExportJob.id)
+        )
+        return result.first() is not None
 
-            if verif.code != code:
-                verif.attempts += 1
-                return False
+    async def delete_expired(self, retention: timedelta) -> Sequence[tuple[UUID, str]]:
+        """
+        Удаляет задачи старше `retention`, кроме выполняющихся. Без коммита.
 
-            verif.is_verified = True
-            verif.attempts += 1
-            return True
+        Returns:
+            `(id, format)` удалённых задач — по ним удаляются файлы.
+        """
+        result = await self.db_session.execute(
+            delete(ExportJob)
+            .where(
+                ExportJob.created_at < func.now() - retention,
+                ExportJob.status != ExportStatus.running,
+            )
+            .returning(ExportJob.id, ExportJob.format)
+        )
+        return [(obj_id, format) for obj_id, format in result.all()]
@@ -1,20 +1,36 @@
-from typing import IO, Optional
-from io import BytesIO
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse
-import requests
-from sqlalchemy import select, update
+from typing import Annotated, Literal, Optional
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+import httpx
 from starlette.responses import JSONResponse
-import pandas as pd
 
-from src.config import settings
-from src.dependencies import AuthDep, DBSessionDep
-from src.vote.dependencies import SmsRepoDep, UserRepoDep, VotingRepoDep
-from src.vote.models import User, Voting
+from src.dependencies import AuthDep, mark_recent_write
+from src.vote.export import (
+    CSV_MEDIA_TYPE,
+    XLSX_MEDIA_TYPE,
+    csv_chunks,
+    iter_user_rows,
+    xlsx_chunks,
+)
+from src.vote.dependencies import (
+    ExportJobRepoDep,
+    ReadUserRepoDep,
+    ReadVotingRepoDep,
+    SmsRepoDep,
+    UserRepoDep,
+    VotingRepoDep,
+)
+from src.vote.export_jobs import export_path, export_worker
+from src.vote.models import ExportStatus
 from src.vote.schemas import (
     CaptchaValidateResp,
+    ExportJobCreate,
+    ExportJobRead,
     SmsVerifyBody,
     UserCreate,
+    UserPageQuery,
+    UserPage,
     UserRead,
     UserUpdate,
     ValidateVote,
@@ -22,47 +38,53 @@ from src.vote.schemas import (
     VotingUpdate,
 )
 
-from src.core.sms_aero import send_code
+from src.config import settings
+from src.core.captcha import captcha_client
+from src.core.rate_limit import client_ip, limit_phone
+from src.core.http_cache import CachedResponse, cache_control
+from src.core.response_cache import ResponseCache
+from src.core.schemas import BulkDeleteResult, BulkUpdateResult
+from src.core.sms_aero import sms_text
+from src.database import READ_REPLICA, async_session_maker
+from src.vote.reposiotory import VotingRepo
+from src.vote.sms_outbox import sms_outbox_worker
 
 from loguru import logger
 
 router = APIRouter(prefix="/vote", tags=["vote"])
 
+# готовое тело /vote/vote_info: одинаково для всех посетителей лендинга
+vote_info_cache: ResponseCache[CachedResponse] = ResponseCache(
+    ttl=settings.VOTE_INFO_CACHE_TTL
+)
+PUBLIC_CACHE_CONTROL = cache_control(
+    settings.PUBLIC_CACHE_MAX_AGE, settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE
+)
+
 
 @router.post("/validate")
 async def validate_vote(
     form_data: ValidateVote,
     request: Request,
-    user_repo: UserRepoDep,
     sms_repo: SmsRepoDep,
-    db: DBSessionDep,
 ):
     if not form_data.token:
         raise HTTPException(status_code=400, detail="Missing token")
 
-    # 2. Валидация капчи --------------------------------------------------------
-    forwarded_for = request.headers.get("x-forwarded-for")
-    client_ip = (
-        forwarded_for.split(",")[0].strip()
-        if forwarded_for
-        else (request.client.host if request.client else None)
-    )
-
-    body = {
-        "secret": settings.YCAPTCHA_SERVER_KEY,
-        "token": form_data.token,
-        **({"ip": client_ip} if client_ip else {}),
-    }
+    # 1. Лимит выдачи кодов на номер — до похода в капчу ------------------------
+    await limit_phone(form_data.phone_number)
 
-    resp = requests.post(
-        "https://smartcaptcha.yandexcloud.net/validate", data=body, timeout=2
-    )
+    # 2. Валидация капчи --------------------------------------------------------
+    try:
+        resp = await captcha_client.validate(form_data.token, client_ip(request))
+    except httpx.HTTPError as exc:
+        logger.error("Captcha request failed: {!r}", exc)
+        raise HTTPException(status_code=502, detail="Captcha service error")
     if resp.status_code != 200:
         raise HTTPException(status_code=502, detail="Captcha service error")
 
-    logger.info(resp.json())
-
     result = CaptchaValidateResp.model_validate(resp.json())
+    logger.debug("Captcha response: {!r}", result)
 
     if result.status != "ok":
         return JSONResponse(
@@ -70,112 +92,96 @@ async def validate_vote(
             content={"status": "failed", "message": result.message},
         )
 
-    phone = form_data.phone_number
-
+    code = sms_repo.new_code()
     try:
-        logger.info("Перед поиском пользователя")
-        stmt = select(User).where(User.phone_number == phone)
-        user: User | None = await db.scalar(stmt)
-
-        logger.info("После поиска пользователя")
-        if user is None:
-            user = await user_repo.create(
-                UserCreate(
-                    phone_number=form_data.phone_number,
-                    full_name=form_data.full_name,
-                    email=form_data.email,
-                )
-            )
-
-        logger.info("Перед отправкой смс")
-        code = await sms_repo.create_or_resend(phone, user.id)
-        logger.info("После отправки смс")
-
-        if code is None:
-            raise HTTPException(
-                status_code=400,
-                detail={"status": "already_verified", "host": result.host},
-            )
-
-        try:
-            send_code(phone, code)
-        except Exception as exc:
-            logger.exception("SMS sending failed")
-            raise HTTPException(502, "SMS provider error")
-
-        await db.commit()
-        return {"status": "sms_sent", "host": result.host}
-
-    except Exception:
+        # пользователь, код и СМС в outbox — одним оператором
+        issued = await sms_repo.intake(
+            UserCreate(
+                phone_number=form_data.phone_number,
+                full_name=form_data.full_name,
+                email=form_data.email,
+            ),
+            code,
+            sms_text(code),
+        )
+    except Exception as exc:
+        logger.opt(exception=exc).error("Intake failed: {!r}", exc)
         raise HTTPException(status_code=500, detail="Server error")
 
+    if not issued:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "already_verified", "host": result.host},
+        )
+
+    sms_outbox_worker.wake()
+    return {"status": "sms_sent", "host": result.host}
+
 
 @router.post("/verify_sms")
 async def verify_sms(
     body: SmsVerifyBody,
     repo: SmsRepoDep,
-    voting_repo: VotingRepoDep,
 ):
+    # без лимита на номер: иначе любой мог бы заблокировать чужой номер без
+    # капчи. Перебор ограничен счётчиком неудачных попыток на самом коде
+    # (`SmsVerificationRepo.MAX_ATTEMPTS`), а новые коды — лимитом /validate.
+    # Код и инкремент счётчика подписей — одним оператором
     ok = await repo.verify_code(body.phone, body.code)
     if not ok:
         raise HTTPException(400, "Код неверен, истёк или превышено число попыток")
-
-    try:
-        voting = (await voting_repo.get_all())[0]
-        await voting_repo.db_session.execute(
-            update(Voting)
-            .where(Voting.id == voting.id)
-            .values(fake_quantity=Voting.fake_quantity + 1)
-        )
-        await voting_repo.db_session.commit()
-
-    except Exception as exc:
-        logger.error(f"Не удалось сделать инкримент {exc}")
+    vote_info_cache.invalidate()
     return {"status": "ok"}
 
 
-@router.get("/vote_info")
-async def vote_counts(
-    voting_repo: VotingRepoDep,
-    user_repo: UserRepoDep,
-) -> VotingRead:
-    votings = await voting_repo.get_all()
-    if not votings:
+async def _load_vote_info() -> CachedResponse:
+    # своя сессия: загрузку делят несколько запросов, и отмена одного из них
+    # не должна закрыть сессию остальным
+    async with async_session_maker(info={READ_REPLICA: True}) as session:
+        current = await VotingRepo(db_session=session).get_current_with_counts()
+    if current is None:
         raise HTTPException(status_code=404, detail="No voting campaigns found")
 
-    voting = votings[0]
-    users = await user_repo.get_all_valid()
-    real_quantity = len(users)
-    quantity = real_quantity if voting.show_real else voting.fake_quantity
+    voting, real_quantity, fake_quantity, changed_at = current
+    quantity = real_quantity if voting.show_real else fake_quantity
 
-    return VotingRead(
+    body = VotingRead(
         start_date=voting.start_date,
         end_date=voting.end_date,
         quantity=quantity,
         status=voting.status,
+    ).model_dump_json().encode()
+    # тело зависит только от строки кампании и показываемого счётчика
+    return CachedResponse.build(
+        body,
+        version=(voting.id, voting.updated_at.isoformat(), quantity),
+        last_modified=changed_at,
+        cache_control=PUBLIC_CACHE_CONTROL,
     )
 
 
+@router.get("/vote_info", response_model=VotingRead)
+async def vote_counts(request: Request) -> Response:
+    cached = await vote_info_cache.get_or_load(_load_vote_info)
+    return cached.to_response(request.headers)
+
+
 @router.get("/dash_vote_info")
 async def vote_info(
     pyload: AuthDep,
-    voting_repo: VotingRepoDep,
-    user_repo: UserRepoDep,
+    voting_repo: ReadVotingRepoDep,
 ) -> VotingUpdate:
-    votings = await voting_repo.get_all()
-    if not votings:
+    current = await voting_repo.get_current_with_counts()
+    if current is None:
         raise HTTPException(status_code=404, detail="No voting campaigns found")
 
-    voting = votings[0]
-    users = await user_repo.get_all()
-    real_quantity = len(users)
-
+    voting, real_quantity, fake_quantity, _ = current
     return VotingUpdate(
         id=voting.id,
         start_date=voting.start_date,
         end_date=voting.end_date,
         real_quantity=real_quantity,
-        fake_quantity=voting.fake_quantity,
+        fake_quantity=fake_quantity,
         show_real=voting.show_real,
         status=voting.status,
     )
@@ -184,29 +190,99 @@ async def vote_info(
 @router.get("/all_user")
 async def get_all_user(
     pyload: AuthDep,
-    user_repo: UserRepoDep,
+    user_repo: ReadUserRepoDep,
 ) -> list[UserRead]:
-    return [UserRead.model_validate(obj) for obj in await user_repo.get_all()]
+    users = await user_repo.get_all()
+    await user_repo.load_pii(users)
+    return [UserRead.model_validate(obj) for obj in users]
+
+
+@router.get("/users")
+async def get_users_page(
+    pyload: AuthDep,
+    user_repo: ReadUserRepoDep,
+    query: Annotated[UserPageQuery, Query()],
+) -> UserPage:
+    items, next_cursor = await user_repo.get_page(
+        limit=query.limit,
+        cursor=query.cursor,
+        filters=query.model_dump(exclude_none=True, exclude={"limit", "cursor"}),
+    )
+    await user_repo.load_pii(items)
+    return UserPage(
+        items=[UserRead.model_validate(obj) for obj in items],
+        next_cursor=next_cursor,
+    )
 
 
 @router.post("/update_user")
 async def get_update_user(
     pyload: AuthDep,
     user_repo: UserRepoDep,
+    voting_repo: VotingRepoDep,
     form_data: UserUpdate,
+    response: Response,
 ) -> Optional[UserUpdate]:
-    upd_obj = await user_repo.update(obj_id=form_data.id, data=form_data)
+    is_signed = await user_repo.set_valid_vote(form_data.id, form_data.valid_vote)
+    if is_signed:
+        await voting_repo.add_real_quantity(1 if form_data.valid_vote else -1)
+    await user_repo.db_session.commit()
+    mark_recent_write(response)
+    vote_info_cache.invalidate()
+
+    upd_obj = await user_repo.get(form_data.id)
     if upd_obj:
         return UserUpdate.model_validate(upd_obj)
 
 
+@router.post("/update_users")
+async def update_users(
+    pyload: AuthDep,
+    user_repo: UserRepoDep,
+    voting_repo: VotingRepoDep,
+    form_data: list[UserUpdate],
+    response: Response,
+) -> BulkUpdateResult:
+    result = await user_repo.update_many(items=[(item.id, item) for item in form_data])
+    # счётчик пересчитываем одним запросом, а не инкрементом на каждую строку
+    await voting_repo.reconcile_real_quantity()
+    await voting_repo.db_session.commit()
+    mark_recent_write(response)
+    vote_info_cache.invalidate()
+    return result
+
+
+@router.post("/delete_users")
+async def delete_users(
+    pyload: AuthDep,
+    user_repo: UserRepoDep,
+    voting_repo: VotingRepoDep,
+    form_data: list[UUID],
+    response: Response,
+) -> BulkDeleteResult:
+    result = await user_repo.delete_many(obj_ids=form_data)
+    await voting_repo.reconcile_real_quantity()
+    await voting_repo.db_session.commit()
+    mark_recent_write(response)
+    vote_info_cache.invalidate()
+    return result
+
+
 @router.post("/update_vote")
 async def update_vote(
     pyload: AuthDep,
     voting_repo: VotingRepoDep,
     form_data: VotingUpdate,
+    response: Response,
 ) -> Optional[VotingUpdate]:
-    upd_obj = await voting_repo.update(obj_id=form_data.id, data=form_data)
+    # real_quantity ведётся счётчиком, из формы его не принимаем;
+    # несвёрнутые слоты переносим заранее, чтобы fake_quantity из формы был итоговым
+    await voting_repo.fold_counter_shards()
+    upd_obj = await voting_repo.update(
+        obj_id=form_data.id, data=form_data, exclude_fields=["real_quantity"]
+    )
+    mark_recent_write(response)
+    vote_info_cache.invalidate()
     if upd_obj:
         return VotingUpdate.model_validate(upd_obj)
 
@@ -214,30 +290,70 @@ async def update_vote(
 @router.get("/export_users_excel", response_class=StreamingResponse)
 async def export_users_excel(
     pyload: AuthDep,
-    user_repo: UserRepoDep,
+    format: Literal["xlsx", "csv"] = "xlsx",
 ) -> StreamingResponse:
-    users = await user_repo.get_all()
-    data = [
-        {
-            "ID": str(u.id),
-            "Full Name": u.full_name or "",
-            "Email": u.email or "",
-            "Phone Number": u.phone_number,
-            "Valid Vote": "Да" if u.valid_vote else "Нет",
-        }
-        for u in users
-    ]
-
-    # 2. DataFrame -> Excel в память
-    df = pd.DataFrame(data)
-    buffer: IO[bytes] = BytesIO()  # достаточно IO[bytes] для Pyright
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:  # pyright: ignore
-        df.to_excel(writer, index=False)
-    buffer.seek(0)
-
-    # 3. Отдаём файл
+    rows = iter_user_rows()
+    if format == "csv":
+        body, media_type = csv_chunks(rows), CSV_MEDIA_TYPE
+    else:
+        body, media_type = xlsx_chunks(rows), XLSX_MEDIA_TYPE
+
     return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": 'attachment; filename="users.xlsx"'},
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
+@router.post("/exports", status_code=202)
+async def create_export(
+    pyload: AuthDep,
+    user_repo: UserRepoDep,
+    export_repo: ExportJobRepoDep,
+    format: Literal["xlsx", "csv"] = "xlsx",
+) -> ExportJobRead:
+    """
+    Ставит выгрузку в очередь. Если таблица не менялась с прошлой выгрузки
+    того же формата, возвращает её (готовую или ещё выполняющуюся).
+    """
+    fingerprint = await user_repo.dataset_fingerprint()
+    job = await export_repo.find_reusable(format, fingerprint)
+    if job is None or (
+        job.status == ExportStatus.done and not export_path(job).exists()
+    ):
+        job = await export_repo.create(
+            ExportJobCreate(format=format, fingerprint=fingerprint)
+        )
+        export_worker.wake()
+    return ExportJobRead.model_validate(job)
+
+
+@router.get("/exports/{job_id}")
+async def get_export(
+    pyload: AuthDep,
+    job_id: UUID,
+    export_repo: ExportJobRepoDep,
+) -> ExportJobRead:
+    job = await export_repo.get_or_404(job_id)
+    return ExportJobRead.model_validate(job)
+
+
+@router.get("/exports/{job_id}/download", response_class=FileResponse)
+async def download_export(
+    pyload: AuthDep,
+    job_id: UUID,
+    export_repo: ExportJobRepoDep,
+) -> FileResponse:
+    job = await export_repo.get_or_404(job_id)
+    if job.status != ExportStatus.done:
+        raise HTTPException(status_code=409, detail=f"Export is {job.status.value}")
+    path = export_path(job)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Export file has expired")
+
+    # FileResponse сам отвечает на Range / If-Range (206) — докачка с места обрыва
+    return FileResponse(
+        path,
+        media_type=CSV_MEDIA_TYPE if job.format == "csv" else XLSX_MEDIA_TYPE,
+        filename=f"users.{job.format}",
     )
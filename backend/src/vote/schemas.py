@@ -1,10 +1,21 @@
 from datetime import datetime
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field, constr, field_serializer
 
-from src.vote.models import VoteStatus
+from src.vote.models import ExportStatus, VoteStatus
+
+
+PHONE_PATTERN = r"^(?:\+7\d{10}|\+373\d{8})$"
+
+Phone = Annotated[
+    str,
+    Field(
+        pattern=PHONE_PATTERN,
+        description="Только +7xxxxxxxxxx или +373xxxxxxxx",
+    ),
+]
 
 
 class UserCreate(BaseModel):
@@ -16,6 +27,8 @@ class UserCreate(BaseModel):
 
 
 class ValidateVote(UserCreate):
+    # номер из формы уходит в `sms_verification` / `sms_outbox` (BIGINT)
+    phone_number: Phone
     token: str
 
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
@@ -34,6 +47,41 @@ class UserRead(UserCreate):
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
 
 
+class UserFilter(BaseModel):
+    valid_vote: Optional[bool] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    phone_prefix: Optional[str] = Field(
+        default=None,
+        max_length=20,
+        description=(
+            "Начало номера. При PII_ENCRYPTION номера зашифрованы и префиксный "
+            "поиск невозможен: принимается только полный номер (+7xxxxxxxxxx "
+            "или +373xxxxxxxx), иначе 400"
+        ),
+    )
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+
+class UserPageQuery(UserFilter):
+    """
+    Query-параметры `/vote/users`. FastAPI разворачивает модель в отдельные
+    параметры, только если она единственный query-параметр ручки, поэтому
+    пагинация живёт здесь же, рядом с фильтрами.
+    """
+
+    limit: int = Field(default=100, ge=1, le=500)
+    cursor: Optional[str] = None
+
+
+class UserPage(BaseModel):
+    items: list[UserRead]
+    next_cursor: Optional[str] = None
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+
 class VotingCreate(BaseModel):
     start_date: datetime
     end_date: datetime
@@ -81,6 +129,39 @@ class SmsVerificationRead(SmsVerificationUpdate):
     model_config = ConfigDict(populate_by_name=True, from_attributes=True)
 
 
+class SmsOutboxCreate(BaseModel):
+    phone_number: str
+    body: str
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+
+class SmsOutboxUpdate(SmsOutboxCreate):
+    id: UUID
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+
+class ExportJobCreate(BaseModel):
+    format: Literal["xlsx", "csv"]
+    fingerprint: str
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+
+class ExportJobRead(BaseModel):
+    id: UUID
+    format: str
+    status: ExportStatus
+    rows: Optional[int] = None
+    size: Optional[int] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
+
 class CaptchaValidateResp(BaseModel):
     status: str
     message: Optional[str]
@@ -93,13 +174,6 @@ class CaptchaValidateResp(BaseModel):
         return value or ""
 
 
-Phone = Annotated[
-    str,
-    Field(
-        pattern=r"^(?:\+7\d{10}|\+373\d{8})$",
-        description="Только +7xxxxxxxxxx или +373xxxxxxxx",
-    ),
-]
 Code6 = Annotated[
     str,
     Field(
@@ -0,0 +1,128 @@
+"""
+Фоновая отправка СМС из таблицы `sms_outbox`.
+
+Обработчик запроса только пишет строку outbox'а в своей транзакции, а воркер
+забирает готовые сообщения пачками (`FOR UPDATE SKIP LOCKED`, безопасно при
+нескольких процессах uvicorn), отправляет их с ограничением параллельности и
+частоты запросов к шлюзу и перепланирует неудачные попытки с экспоненциальной
+задержкой.
+"""
+
+import asyncio
+import random
+from datetime import timedelta
+from typing import Optional
+
+from loguru import logger
+
+from src.config import settings
+from src.core.rate_limit import TokenBucket
+from src.core.sms_aero import sms_client
+from src.database import async_session_maker
+from src.vote.models import SmsOutbox
+from src.vote.reposiotory import SmsOutboxRepo
+
+
+class SmsOutboxWorker:
+    # сколько сообщение считается «в работе» у забравшего его воркера
+    LEASE = timedelta(seconds=60)
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(settings.SMS_WORKER_CONCURRENCY)
+        # лимиты на провайдера; сейчас провайдер один
+        self._limits = {"smsaero": TokenBucket(settings.SMS_RATE_LIMIT, burst=1)}
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def wake(self) -> None:
+        """Разбудить воркер сразу после коммита нового сообщения."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("SMS outbox claim failed: {}", exc)
+                claimed = []
+
+            if claimed:
+                errors = await asyncio.gather(*(self._deliver(msg) for msg in claimed))
+                try:
+                    await self._record(claimed, errors)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    # результаты потеряны: по истечении аренды пачка будет
+                    # заново забрана и уже доставленные СМС уйдут повторно
+                    logger.error("SMS outbox record failed: {}", exc)
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.SMS_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> list[SmsOutbox]:
+        async with async_session_maker() as session:
+            claimed = await SmsOutboxRepo(db_session=session).claim_batch(
+                limit=settings.SMS_WORKER_CONCURRENCY, lease=self.LEASE
+            )
+        return list(claimed)
+
+    def _retry_delay(self, attempts: int) -> Optional[timedelta]:
+        if attempts >= settings.SMS_MAX_ATTEMPTS:
+            return None
+        delay = min(settings.SMS_RETRY_BASE_DELAY * 2 ** (attempts - 1), self.MAX_RETRY_DELAY)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    async def _deliver(self, msg: SmsOutbox) -> Optional[str]:
+        """Отправляет одно сообщение; возвращает текст ошибки или None."""
+        async with self._slots:
+            await self._limits["smsaero"].acquire()
+            try:
+                await sms_client.send(msg.phone_number, msg.body)
+            except Exception as exc:
+                return repr(exc)
+        return None
+
+    async def _record(
+        self, claimed: list[SmsOutbox], errors: list[Optional[str]]
+    ) -> None:
+        """Записывает результаты пачки одной транзакцией."""
+        async with async_session_maker() as session:
+            repo = SmsOutboxRepo(db_session=session)
+            await repo.mark_sent(
+                [msg.id for msg, error in zip(claimed, errors) if error is None]
+            )
+            for msg, error in zip(claimed, errors):
+                if error is None:
+                    continue
+                retry_in = self._retry_delay(msg.attempts)
+                logger.warning(
+                    "SMS {} attempt {} failed: {}; {}",
+                    msg.id,
+                    msg.attempts,
+                    error,
+                    f"retry in {retry_in}" if retry_in else "giving up",
+                )
+                await repo.mark_failed(msg.id, error, retry_in)
+            await session.commit()
+
+
+sms_outbox_worker = SmsOutboxWorker()
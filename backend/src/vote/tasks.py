@@ -0,0 +1,23 @@
+"""
+Фоновые задачи модуля голосования.
+"""
+
+from loguru import logger
+
+from src.database import async_session_maker
+from src.vote.reposiotory import VotingRepo
+
+
+async def reconcile_signature_counter() -> None:
+    """Пересчитывает `Voting.real_quantity` по таблице `user`."""
+    async with async_session_maker() as session:
+        total = await VotingRepo(db_session=session).reconcile_real_quantity()
+        await session.commit()
+    logger.info("Signature counter reconciled: {}", total)
+
+
+async def fold_signature_counter() -> None:
+    """Сворачивает слоты шардированного счётчика в строку `voting`."""
+    async with async_session_maker() as session:
+        await VotingRepo(db_session=session).fold_counter_shards()
+        await session.commit()
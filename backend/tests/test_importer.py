@@ -0,0 +1,94 @@
+"""
+Импорт подписей: строки без ФИО или email отбраковываются и не ломают
+выдачу пользователей.
+
+Нужна рабочая база из настроек приложения (после `alembic upgrade head`).
+"""
+
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, exists, select
+
+import src.main
+from src.auth.models import Admin
+from src.database import async_session_maker, blind_index
+from src.dependencies import auth
+from src.vote.importer import _columns, import_users
+from src.vote.models import User
+
+T = TypeVar("T")
+
+PHONES = ("+37377700101", "+37377700102", "+37377700103")
+ADMIN_EMAIL = "importer-test@example.com"
+
+
+async def _create_admin() -> str:
+    async with async_session_maker() as session:
+        admin = Admin(email=ADMIN_EMAIL, hashed_password="-")
+        session.add(admin)
+        await session.commit()
+        return str(admin.id)
+
+
+def _test_users():
+    return User.phone_hash.in_([blind_index(phone) for phone in PHONES])
+
+
+async def _phones_taken() -> bool:
+    async with async_session_maker() as session:
+        return await session.scalar(select(exists().where(_test_users()))) or False
+
+
+async def _cleanup() -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(User).where(_test_users()))
+        await session.execute(delete(Admin).where(Admin.email == ADMIN_EMAIL))
+        await session.commit()
+
+
+def _run(client: TestClient, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+    # портал есть, пока TestClient открыт через `with`
+    assert client.portal is not None
+    return client.portal.call(func, *args)
+
+
+@pytest.fixture
+def client():
+    with TestClient(src.main.app, base_url="https://testserver") as client:
+        # чужие записи с этими номерами не трогаем
+        if _run(client, _phones_taken):
+            pytest.skip("test phone numbers already exist in the database")
+        admin_id = _run(client, _create_admin)
+        client.cookies.set("access_token", auth.create_access_token(uid=admin_id))
+        yield client
+        _run(client, _cleanup)
+
+
+def test_rows_without_name_or_email_are_rejected(client: TestClient, tmp_path: Path):
+    path = tmp_path / "signatures.csv"
+    path.write_text(
+        "ФИО,Email,Телефон\n"
+        f"Иван Иванов,ivan@example.com,{PHONES[0]}\n"
+        f"Пётр Петров,,{PHONES[1]}\n"
+        f",anon@example.com,{PHONES[2]}\n",
+        encoding="utf-8",
+    )
+
+    result = _run(client, import_users, path)
+
+    assert result.total == 3
+    assert result.inserted == 1
+    assert result.rejected == [(3, "missing email"), (4, "missing full name")]
+
+    for url in ("/vote/all_user", "/vote/users"):
+        response = client.get(url)
+        assert response.status_code == 200, response.text
+
+
+def test_header_without_email_column_is_rejected():
+    with pytest.raises(ValueError, match="email"):
+        _columns(["ФИО", "Телефон"])